@@ -0,0 +1,29 @@
+"""
+Nonogram logic: representing, solving and generating nonograms
+
+The core (representations, line solving, propagation, search and the Grid facade) is
+imported eagerly and cheaply; Batch (process pools), PuzzleIO (file formats), Session
+(interactive play) and SolutionStore (known puzzles on disk) are only imported on first
+access, as are the generator behind Grid.generate and the NumPy line solver behind
+Grid.propagate_batched, so that worker processes and command-line runs pay only for what
+they use
+"""
+from .core import Filling, FillingArray, Row, PackedArray
+from .grid import Grid
+from .instrument import Trace
+from .line import ClueIndex, LineCache
+
+LAZY_ATTRIBUTES = {"Batch": "batch", "PuzzleIO": "formats", "Session": "session",
+                   "SolutionStore": "store"}
+
+__all__ = ["Filling", "FillingArray", "Row", "PackedArray", "Grid", "Trace", "ClueIndex", \
+    "LineCache"] + list(LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    if name in LAZY_ATTRIBUTES:
+        import importlib
+        value = getattr(importlib.import_module("." + LAZY_ATTRIBUTES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
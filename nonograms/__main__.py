@@ -0,0 +1,9 @@
+"""
+python -m nonograms: the command-line interface, see nonograms.cli
+"""
+import sys
+
+from .cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
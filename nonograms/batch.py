@@ -0,0 +1,339 @@
+"""
+Process-pool batch solving and generation. Loaded on first use of nonograms.Batch
+"""
+import itertools
+import multiprocessing
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from .core import PackedArray
+from .generator import generate
+from .line import LineCache
+from .propagation import cap_guess
+from .rating import rate
+from .search import solve, split
+
+
+class Batch:
+    """
+    Bulk solving and generation spread over a ProcessPoolExecutor
+
+    Work is cut into chunks of chunksize items, at most two chunks per worker are in flight at
+    once so arbitrarily long iterables stream through in bounded memory, and results come back
+    as (index, result) pairs, either in input order or as chunks complete. Only fill_lists and
+    packed row masks (see PackedArray.pack) cross process boundaries
+    With jobs=1 everything runs in the calling process
+    """
+
+    @staticmethod
+    def solve(puzzles, jobs=None, chunksize=16, ordered=True, timeout=None, max_solutions=2, \
+        method="search", store=None):
+        """
+        Yields (index, result) for each (row_fill_lists, col_fill_lists) pair of puzzles, where
+        result is a dict with keys
+        status    - "unique", "multiple", "unsolvable" or "timeout", or "solved" when
+                    max_solutions is 1 and a solution was found without telling whether it is
+                    unique; with method "line", "solved", "stalled" or "unsolvable"
+        solutions - list of solutions found (at most max_solutions), each a tuple of row
+                    filled masks, bit i of a mask standing for column i
+        seconds   - time spent on the puzzle
+
+        method is "search" for solve, "sat" for the SAT backend (nonograms.sat.solve, which
+        needs pycosat), or "line" for cap_guess alone, which stalls rather than guesses when
+        line logic runs out. timeout is a per-puzzle limit in seconds, enforced inside the
+        worker; method "line" takes none
+
+        store is an optional SolutionStore (methods "search" and "sat" only). Each puzzle is
+        looked up before it is handed to a worker, and one the store can answer is not solved
+        again; every other result but a timeout is recorded. Results then also have the key
+        stored - whether the solutions came from the store
+        """
+        assert method in ("search", "sat", "line"), "method must be 'search', 'sat' or 'line'"
+        assert store is None or method != "line", "a store cannot answer method 'line'"
+        assert timeout is None or method != "line", "method 'line' takes no timeout"
+        options = {"timeout": timeout, "max_solutions": max_solutions, "method": method}
+        if store is None:
+            return Batch.run(Batch.solve_chunk, puzzles, options, jobs, chunksize, ordered)
+        return Batch.solve_stored(puzzles, options, jobs, chunksize, ordered, store)
+
+    @staticmethod
+    def solve_stored(puzzles, options, jobs, chunksize, ordered, store):
+        """Batch.solve with a store: answers found in the store travel to solve_chunk in
+        place of their puzzle and come back untouched"""
+        waiting = {} # index -> fill_lists of a puzzle being solved, to record its result
+        def items():
+            for index, (row_fill_lists, col_fill_lists) in enumerate(puzzles):
+                started = time.monotonic()
+                answer = store.lookup(row_fill_lists, col_fill_lists, options["max_solutions"])
+                if answer is None:
+                    waiting[index] = (row_fill_lists, col_fill_lists)
+                    yield row_fill_lists, col_fill_lists
+                else:
+                    solutions, complete = answer
+                    yield {"status": Batch.solve_status(solutions, options["max_solutions"], \
+                               complete), "solutions": solutions,
+                           "seconds": time.monotonic() - started, "stored": True}
+        for index, result in Batch.run(Batch.solve_chunk, items(), options, jobs, chunksize, \
+            ordered):
+            if index in waiting:
+                row_fill_lists, col_fill_lists = waiting.pop(index)
+                if result["status"] != "timeout":
+                    max_solutions = options["max_solutions"]
+                    store.record(row_fill_lists, col_fill_lists, result["solutions"], \
+                        max_solutions is None or len(result["solutions"]) < max_solutions)
+                result["stored"] = False
+            yield index, result
+        store.commit()
+
+    @staticmethod
+    def generate(specs, jobs=None, chunksize=4, ordered=True, timeout=None, store=None):
+        """
+        Yields (index, result) for each generation spec, a dict of generate's keyword
+        arguments (numrows, numcols, and optionally density, difficulty and max_flips) plus an
+        optional seed for the random module. result is a dict with keys
+        status         - "generated", "timeout" or "duplicate"
+        row_fill_lists - fill_lists of the rows, or None unless generated
+        col_fill_lists - fill_lists of the columns, or None unless generated
+        solution       - tuple of the key's row filled masks, or None unless generated
+        seconds        - time spent on the spec
+
+        store is an optional SolutionStore. Workers read it and draw again, up to
+        DUPLICATE_RETRIES times, when a puzzle they generate is already in it up to symmetry;
+        every new puzzle is recorded with its unique solution, and one another worker
+        recorded first comes back as a "duplicate"
+        """
+        options = {"timeout": timeout, "store": store.path if store is not None else None}
+        if store is None:
+            return Batch.run(Batch.generate_chunk, specs, options, jobs, chunksize, ordered)
+        return Batch.generate_stored(specs, options, jobs, chunksize, ordered, store)
+
+    DUPLICATE_RETRIES = 16
+
+    @staticmethod
+    def generate_stored(specs, options, jobs, chunksize, ordered, store):
+        """Batch.generate with a store: records every generated puzzle"""
+        for index, result in Batch.run(Batch.generate_chunk, specs, options, jobs, chunksize, \
+            ordered):
+            if result["status"] == "generated":
+                if not store.record(result["row_fill_lists"], result["col_fill_lists"], \
+                    [result["solution"]], True):
+                    result.update(status="duplicate", row_fill_lists=None, \
+                        col_fill_lists=None, solution=None)
+                else:
+                    # commit at once so that workers skip this puzzle from now on
+                    store.commit()
+            yield index, result
+
+    @staticmethod
+    def rate(puzzles, jobs=None, chunksize=32, ordered=True, timeout=None):
+        """
+        Yields (index, result) for each (row_fill_lists, col_fill_lists) pair of puzzles, where
+        result is the dict returned by nonograms.rating.rate plus keys
+        status  - "rated" or "timeout" (in which case the rating keys are absent)
+        seconds - time spent on the puzzle
+        """
+        options = {"timeout": timeout}
+        return Batch.run(Batch.rate_chunk, puzzles, options, jobs, chunksize, ordered)
+
+    @staticmethod
+    def split_solve(pub_array, row_fill_lists, col_fill_lists, max_solutions=1, jobs=None, \
+        tasks_per_job=4, timeout=None):
+        """
+        solve for a single hard puzzle, spread over a ProcessPoolExecutor. The search tree is
+        split with split into about tasks_per_job disjoint subtrees per worker, and once
+        max_solutions have been found (1 to find a solution, 2 to check uniqueness) the remaining
+        subtrees are cancelled and the running ones told to stop
+        Returns a list of at most max_solutions solution PackedArrays; raises TimeoutError if
+        timeout seconds pass first
+        """
+        assert max_solutions is not None and max_solutions > 0, "max_solutions must be positive"
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        jobs = jobs or os.cpu_count() or 1
+        subproblems, solutions = split(pub_array, row_fill_lists, col_fill_lists, \
+            jobs * tasks_per_job)
+        if len(solutions) >= max_solutions or not subproblems:
+            return solutions[:max_solutions]
+        stop = multiprocessing.Event()
+        with ProcessPoolExecutor(jobs, initializer=Batch.init_worker, initargs=(stop,)) \
+            as executor:
+            pending = {executor.submit(Batch.solve_subtree, subproblem.pack(), row_fill_lists, \
+                col_fill_lists, max_solutions - len(solutions), deadline) \
+                for subproblem in subproblems}
+            try:
+                while pending and len(solutions) < max_solutions:
+                    remaining = deadline - time.monotonic() if deadline is not None else None
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Search did not finish before its deadline")
+                    done, pending = wait(pending, remaining, FIRST_COMPLETED)
+                    for future in done:
+                        solutions.extend(PackedArray.unpack(packed) for packed in future.result())
+            finally:
+                stop.set()
+                for future in pending:
+                    future.cancel()
+        return solutions[:max_solutions]
+
+    stop_event = None # set in worker processes by Batch.init_worker
+
+    @staticmethod
+    def init_worker(stop_event):
+        Batch.stop_event = stop_event
+
+    @staticmethod
+    def solve_subtree(packed, row_fill_lists, col_fill_lists, max_solutions, deadline):
+        """Batch.split_solve worker: searches one packed subproblem"""
+        solutions = solve(PackedArray.unpack(packed), row_fill_lists, col_fill_lists, \
+            max_solutions, LineCache().deduce, deadline, Batch.stop_event)
+        return [solution.pack() for solution in solutions]
+
+    @staticmethod
+    def run(worker, items, options, jobs=None, chunksize=16, ordered=True):
+        """Yields (index, result) for every item, calling worker(chunk, options) on chunks of
+        chunksize items; worker must return one result per item of its chunk"""
+        assert chunksize > 0, "chunksize must be positive"
+        chunks = Batch.chunk(items, chunksize)
+        if jobs == 1:
+            for start, chunk in chunks:
+                for offset, result in enumerate(worker(chunk, options)):
+                    yield start + offset, result
+            return
+        jobs = jobs or os.cpu_count() or 1
+        with ProcessPoolExecutor(jobs) as executor:
+            in_flight = {} # future -> start index of its chunk
+            order = deque() # futures in submission order, for ordered output
+            def submit_next():
+                for start, chunk in chunks:
+                    future = executor.submit(worker, chunk, options)
+                    in_flight[future] = start
+                    order.append(future)
+                    return True
+                return False
+            while len(in_flight) < 2 * jobs and submit_next():
+                pass
+            while in_flight:
+                if ordered:
+                    done = [order.popleft()]
+                else:
+                    done = wait(in_flight, return_when=FIRST_COMPLETED).done
+                    for future in done:
+                        order.remove(future)
+                for future in done:
+                    start = in_flight.pop(future)
+                    for offset, result in enumerate(future.result()):
+                        yield start + offset, result
+                    submit_next()
+
+    @staticmethod
+    def chunk(items, chunksize):
+        """Yields (start index, list of up to chunksize items) over the iterable items"""
+        iterator = iter(items)
+        start = 0
+        while True:
+            chunk = list(itertools.islice(iterator, chunksize))
+            if not chunk:
+                return
+            yield start, chunk
+            start += len(chunk)
+
+    @staticmethod
+    def solve_chunk(chunk, options):
+        """Batch worker: solves each (row_fill_lists, col_fill_lists) pair of chunk"""
+        cache = LineCache()
+        search = solve
+        if options.get("method") == "sat":
+            from .sat import solve as search # optional backend, imported only when asked for
+        results = []
+        for item in chunk:
+            if isinstance(item, dict): # answered from a store, see Batch.solve_stored
+                results.append(item)
+                continue
+            row_fill_lists, col_fill_lists = item
+            started = time.monotonic()
+            deadline = started + options["timeout"] if options["timeout"] is not None else None
+            blank = PackedArray(len(row_fill_lists), len(col_fill_lists))
+            if options.get("method") == "line":
+                pub_array, error = cap_guess(blank, row_fill_lists, col_fill_lists, cache.deduce)
+                solutions = [pub_array] if pub_array.is_set() and not error else []
+                status = "unsolvable" if error else ["stalled", "solved"][len(solutions)]
+                results.append({"status": status,
+                                "solutions": [solution.pack()[2] for solution in solutions],
+                                "seconds": time.monotonic() - started})
+                continue
+            try:
+                solutions = [solution.pack()[2] for solution in search(blank, row_fill_lists, \
+                    col_fill_lists, options["max_solutions"], cache.deduce, deadline)]
+                status = Batch.solve_status(solutions, options["max_solutions"])
+            except TimeoutError:
+                solutions, status = [], "timeout"
+            results.append({"status": status, "solutions": solutions,
+                            "seconds": time.monotonic() - started})
+        return results
+
+    @staticmethod
+    def solve_status(solutions, max_solutions, complete=False):
+        """Returns the status of Batch.solve for the list of solutions found by a search
+        stopping at max_solutions. A single solution is only "unique" if a second one could
+        have been found, or complete says the solutions are all of them;
+        otherwise "solved"
+        """
+        if len(solutions) != 1:
+            return "multiple" if solutions else "unsolvable"
+        if complete or max_solutions is None or max_solutions >= 2:
+            return "unique"
+        return "solved"
+
+    @staticmethod
+    def generate_chunk(chunk, options):
+        """Batch worker: runs generate for each spec of chunk, drawing again when the store
+        named in options already holds the puzzle"""
+        cache = LineCache()
+        store = None
+        if options.get("store") is not None:
+            from .store import SolutionStore
+            store = SolutionStore(options["store"])
+        results = []
+        for spec in chunk:
+            spec = dict(spec)
+            if spec.get("seed") is not None:
+                random.seed(spec["seed"])
+            spec.pop("seed", None)
+            started = time.monotonic()
+            deadline = started + options["timeout"] if options["timeout"] is not None else None
+            try:
+                grid = generate(line_solver=cache.deduce, deadline=deadline, **spec)
+                for _ in range(Batch.DUPLICATE_RETRIES):
+                    if store is None or \
+                        not store.contains(grid.row_fill_lists, grid.col_fill_lists):
+                        break
+                    grid = generate(line_solver=cache.deduce, deadline=deadline, **spec)
+                results.append({"status": "generated", "row_fill_lists": grid.row_fill_lists,
+                                "col_fill_lists": grid.col_fill_lists,
+                                "solution": grid.key_array.pack()[2],
+                                "seconds": time.monotonic() - started})
+            except TimeoutError:
+                results.append({"status": "timeout", "row_fill_lists": None,
+                                "col_fill_lists": None, "solution": None,
+                                "seconds": time.monotonic() - started})
+        if store is not None:
+            store.close()
+        return results
+
+    @staticmethod
+    def rate_chunk(chunk, options):
+        """Batch worker: rates each (row_fill_lists, col_fill_lists) pair of chunk"""
+        cache = LineCache()
+        results = []
+        for row_fill_lists, col_fill_lists in chunk:
+            started = time.monotonic()
+            deadline = started + options["timeout"] if options["timeout"] is not None else None
+            try:
+                result = rate(row_fill_lists, col_fill_lists, cache.deduce, deadline)
+                result["status"] = "rated"
+            except TimeoutError:
+                result = {"status": "timeout"}
+            result["seconds"] = time.monotonic() - started
+            results.append(result)
+        return results
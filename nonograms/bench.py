@@ -0,0 +1,215 @@
+"""
+Benchmark harness for the nonogram engine
+
+Builds seeded puzzle corpora (square grids from 5x5 to 100x100 at several densities) and
+times each stage separately: candidate enumeration (Row.generate_candidates), line deduction
+(Row.deduce_masks), propagation (Grid.cap_guess, and Grid.cap_guess_batched when NumPy is
+installed), full solving (Grid.solve, stopping at two
+solutions) and generation (Grid.generate). Every case reports ops/sec, latency percentiles
+and the peak memory traced during one extra, untimed pass. Results are written as JSON;
+passing an earlier result file with --compare adds the ratio of medians for matching cases
+
+The "import" stage times a cold "import nonograms" in a fresh interpreter, net of the
+interpreter's own startup, and lists any heavy modules that import dragged in
+
+Usage: python -m nonograms.bench [--quick] [--seed N] [--output results.json]
+                                 [--compare old.json]
+"""
+import argparse
+import importlib.util
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from . import Grid, LineCache, PackedArray, Row
+
+SIZES = (5, 10, 15, 25, 50, 100)
+DENSITIES = (0.3, 0.5, 0.7)
+# Stages whose cost explodes with size only run on the smaller corpora
+MAX_SIZE = {"import": 0, "enumerate": 15, "deduce": 100, "cap_guess": 100,
+            "cap_guess_batched": 100, "solve": 25, "generate": 25}
+
+
+# Modules that "import nonograms" should not load; they belong to the lazily imported parts
+HEAVY_MODULES = ("concurrent.futures", "multiprocessing", "json", "numpy", "pycosat", "sqlite3",
+                 "nonograms.batch", "nonograms.formats", "nonograms.generator", "nonograms.sat",
+                 "nonograms.session", "nonograms.store", "nonograms.vectorized")
+
+
+def run_import_case(count):
+    """Times count cold imports of the package, each in a fresh interpreter"""
+    probe = "import sys, time; started = time.perf_counter(); import nonograms; " \
+        "print(time.perf_counter() - started); " \
+        "print(','.join(name for name in %r if name in sys.modules))" % (HEAVY_MODULES,)
+    timings, loaded = [], ""
+    for _ in range(count):
+        output = subprocess.run([sys.executable, "-c", probe], capture_output=True, \
+            text=True, check=True).stdout.split("\n")
+        timings.append(float(output[0]))
+        loaded = output[1]
+    timings.sort()
+    return {"stage": "import", "size": 0, "density": None, "ops": count,
+            "total_s": sum(timings), "ops_per_s": count / sum(timings),
+            "mean_ms": 1000 * sum(timings) / count, "p50_ms": 1000 * percentile(timings, 0.5),
+            "p90_ms": 1000 * percentile(timings, 0.9), "p99_ms": 1000 * percentile(timings, 0.99),
+            "max_ms": 1000 * timings[-1], "heavy_modules_loaded": loaded.split(",") if loaded else []}
+
+
+def corpus(seed, size, density, count):
+    """Returns count Grids of the given size and density, the same ones for the same seed"""
+    random.seed("corpus-%d-%d-%s" % (seed, size, density))
+    return [Grid(size, size, PackedArray.generate_key(size, size, density)) \
+        for _ in range(count)]
+
+
+def partial_lines(grids):
+    """Returns (filled, crossed, length, fill_list) for every row of grids, with about half
+    of each row's key cells revealed, as line deduction sees them mid-propagation"""
+    lines = []
+    for grid in grids:
+        full = (1 << grid.numcols) - 1
+        for row_index in range(grid.numrows):
+            reveal = random.getrandbits(grid.numcols)
+            filled = grid.key_array.row_filled[row_index]
+            lines.append((filled & reveal, full & ~filled & reveal, grid.numcols, \
+                grid.row_fill_lists[row_index]))
+    return lines
+
+
+def stage_operations(stage, seed, size, density, count, timeout):
+    """Returns a list of zero-argument callables, one per timed operation of the stage"""
+    grids = corpus(seed, size, density, count)
+    if stage == "enumerate":
+        return [lambda row=Row.from_masks(filled, crossed, length), fill_list=fill_list: \
+            Row.generate_candidates(row, fill_list) \
+            for filled, crossed, length, fill_list in partial_lines(grids)]
+    if stage == "deduce":
+        return [lambda line=line: Row.deduce_masks(*line) for line in partial_lines(grids)]
+    if stage == "cap_guess":
+        return [lambda grid=grid: Grid.cap_guess(grid.pub_array, grid.row_fill_lists, \
+            grid.col_fill_lists) for grid in grids]
+    if stage == "cap_guess_batched":
+        return [lambda grid=grid: Grid.cap_guess_batched(grid.pub_array, grid.row_fill_lists, \
+            grid.col_fill_lists) for grid in grids]
+    if stage == "solve":
+        return [lambda grid=grid: solve_with_timeout(grid, timeout) for grid in grids]
+    if stage == "generate":
+        random.seed("generate-%d-%d-%s" % (seed, size, density))
+        return [lambda: Grid.generate(size, size, density, \
+            deadline=time.monotonic() + timeout) for _ in range(count)]
+    raise ValueError("Unknown stage %r" % stage)
+
+
+def solve_with_timeout(grid, timeout):
+    try:
+        Grid.solve(grid.pub_array, grid.row_fill_lists, grid.col_fill_lists, 2, \
+            LineCache().deduce, time.monotonic() + timeout)
+    except TimeoutError:
+        pass
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def run_case(stage, seed, size, density, count, timeout):
+    """Times one (stage, size, density) case and returns its JSON-ready result dict"""
+    operations = stage_operations(stage, seed, size, density, count, timeout)
+    timings = []
+    for operation in operations:
+        started = time.perf_counter()
+        operation()
+        timings.append(time.perf_counter() - started)
+    tracemalloc.start()
+    for operation in stage_operations(stage, seed, size, density, count, timeout):
+        operation()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    timings.sort()
+    total = sum(timings)
+    return {"stage": stage, "size": size, "density": density, "ops": len(timings),
+            "total_s": total, "ops_per_s": len(timings) / total if total else None,
+            "mean_ms": 1000 * total / len(timings),
+            "p50_ms": 1000 * percentile(timings, 0.5),
+            "p90_ms": 1000 * percentile(timings, 0.9),
+            "p99_ms": 1000 * percentile(timings, 0.99),
+            "max_ms": 1000 * timings[-1], "peak_kib": peak / 1024}
+
+
+def compare(results, baseline):
+    """Adds "p50_ratio" (this run's median over the baseline's) to every matching case"""
+    previous = {(case["stage"], case["size"], case["density"]): case \
+        for case in baseline["results"]}
+    for case in results:
+        old = previous.get((case["stage"], case["size"], case["density"]))
+        if old and old["p50_ms"]:
+            case["p50_ratio"] = case["p50_ms"] / old["p50_ms"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--count", type=int, default=None,
+                        help="puzzles per case (default 20, 5 with --quick)")
+    parser.add_argument("--timeout", type=float, default=10.0,
+                        help="seconds allowed per solve or generate operation")
+    parser.add_argument("--stages", default=",".join(MAX_SIZE),
+                        help="comma separated subset of " + ",".join(MAX_SIZE))
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)))
+    parser.add_argument("--densities", default=None,
+                        help="(default %s, 0.5 with --quick)" % ",".join(map(str, DENSITIES)))
+    parser.add_argument("--quick", action="store_true",
+                        help="5 puzzles per case, sizes up to 25, density 0.5 only, unless "
+                        "--count or --densities say otherwise")
+    parser.add_argument("--output", help="file to write JSON results to (default stdout)")
+    parser.add_argument("--compare", help="earlier JSON results to compute p50 ratios against")
+    args = parser.parse_args(argv)
+    stages = args.stages.split(",")
+    sizes = [int(size) for size in args.sizes.split(",")]
+    if args.densities is not None:
+        densities = [float(density) for density in args.densities.split(",")]
+    else:
+        densities = [0.5] if args.quick else list(DENSITIES)
+    count = args.count if args.count is not None else 5 if args.quick else 20
+    if args.quick:
+        sizes = [size for size in sizes if size <= 25]
+    results = []
+    for stage in stages:
+        if stage == "import":
+            results.append(run_import_case(count))
+            print("import    p50 %9.3f ms, heavy modules loaded: %s" % (results[-1]["p50_ms"], \
+                ", ".join(results[-1]["heavy_modules_loaded"]) or "none"), file=sys.stderr)
+            continue
+        if stage == "cap_guess_batched" and importlib.util.find_spec("numpy") is None:
+            print("%s skipped: NumPy is not installed" % stage, file=sys.stderr)
+            continue
+        for size in sizes:
+            if size > MAX_SIZE[stage]:
+                continue
+            for density in densities:
+                results.append(run_case(stage, args.seed, size, density, count, args.timeout))
+                print("%-9s %3dx%-3d density %.2f  p50 %9.3f ms" % (stage, size, size, \
+                    density, results[-1]["p50_ms"]), file=sys.stderr)
+    if args.compare:
+        with open(args.compare) as stream:
+            compare(results, json.load(stream))
+    report = {"meta": {"python": platform.python_version(), "platform": platform.platform(),
+                       "seed": args.seed, "count": count, "timeout_s": args.timeout,
+                       "started": time.strftime("%Y-%m-%dT%H:%M:%S")},
+              "results": results}
+    if args.output:
+        with open(args.output, "w") as stream:
+            json.dump(report, stream, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Command-line interface: python -m nonograms {solve,verify-unique,rate,generate,bench,demo}
+
+solve, verify-unique and rate stream puzzles from .non or JSON Lines files (or stdin, "-")
+and write one JSON line per puzzle to stdout, in input order; generate writes its puzzles as
+JSON Lines or .non. --jobs spreads the work over a process pool and --timeout limits each puzzle, so
+large offline batches run from a shell in a single Python process. --store keeps results in an
+SQLite file (see nonograms.store), so puzzles seen in earlier runs, up to symmetry, are looked up
+rather than solved, and generate only writes puzzles not yet in it
+Exit status is 0 when every puzzle got the wanted answer (solved, unique, rated or generated),
+1 otherwise, and 2 on unreadable input
+"""
+import argparse
+import itertools
+import json
+import sys
+from collections import deque
+
+from .core import PackedArray
+from .grid import Grid
+
+FORMATS = ("auto", "non", "jsonl")
+
+# 13x13 sample for the demo command: line logic leaves it ambiguous and it has two solutions
+DEMO_KEY = [
+[1, 0, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 0],
+[1, 0, 1, 0, 0, 0, 0, 0, 0, 1, 0, 1, 1],
+[1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 0, 0, 1],
+[1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 0],
+[1, 1, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 1],
+[1, 1, 0, 1, 1, 1, 1, 0, 1, 1, 1, 1, 0],
+[0, 1, 0, 0, 0, 1, 0, 1, 1, 0, 1, 1, 0],
+[1, 0, 0, 1, 0, 1, 0, 1, 1, 0, 0, 1, 1],
+[0, 1, 1, 0, 1, 1, 1, 1, 0, 0, 1, 0, 0],
+[1, 0, 1, 0, 0, 1, 1, 1, 1, 1, 1, 0, 0],
+[1, 0, 0, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0],
+[1, 0, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
+[0, 1, 0, 0, 0, 1, 1, 1, 1, 0, 1, 0, 1]
+]
+
+
+def read_puzzles(paths, input_format):
+    """Yields (source, Grid) for each puzzle of the files at paths in order, "-" being stdin.
+    Format "auto" goes by extension, or for stdin by whether the first non-blank line is a
+    JSON object"""
+    from .formats import PuzzleIO
+    for path in paths:
+        stream = sys.stdin if path == "-" else open(path)
+        try:
+            lines = iter(stream)
+            chosen = input_format
+            if chosen == "auto" and path != "-":
+                chosen = "jsonl" if path.endswith((".jsonl", ".json")) else "non"
+            elif chosen == "auto":
+                # peek at the first non-blank line, then put the lines read back in front
+                head = []
+                for line in lines:
+                    head.append(line)
+                    if line.strip():
+                        break
+                chosen = "jsonl" if head and head[-1].lstrip().startswith("{") else "non"
+                lines = itertools.chain(head, lines)
+            reader = PuzzleIO.read_jsonl if chosen == "jsonl" else PuzzleIO.read_non
+            for grid in reader(lines):
+                yield path, grid
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+
+def mask_string(masks, numcols):
+    """Returns the goal string (as in PuzzleIO.goal_string) of a tuple of row filled masks"""
+    return "".join("1" if mask >> column_index & 1 else "0" \
+        for mask in masks for column_index in range(numcols))
+
+
+def queued_puzzles(args, pending):
+    """Yields (row_fill_lists, col_fill_lists) for each input puzzle, appending its
+    (source, Grid) to the deque pending so results can be matched up in order"""
+    for source, grid in read_puzzles(args.inputs, args.format):
+        pending.append((source, grid))
+        yield grid.row_fill_lists, grid.col_fill_lists
+
+
+def open_store(args):
+    """Returns a SolutionStore for args.store, or None if no store was asked for"""
+    if args.store is None:
+        return None
+    from .store import SolutionStore
+    return SolutionStore(args.store)
+
+
+def solve_command(args, out):
+    """solve and verify-unique: one JSON line per input puzzle"""
+    from .batch import Batch
+    verify = args.command == "verify-unique"
+    if verify:
+        max_solutions, method = 2, "search"
+    else:
+        max_solutions, method = args.max_solutions, args.method
+    if args.store is not None and method == "line":
+        raise ValueError("--store cannot be used with --method line")
+    if args.timeout is not None and method == "line":
+        raise ValueError("--timeout cannot be used with --method line")
+    wanted = ("unique",) if verify else ("unique", "multiple", "solved")
+    pending = deque() # (source, grid) of puzzles handed to Batch.solve but not yet reported
+    failures = 0
+    store = open_store(args)
+    try:
+        for index, result in Batch.solve(queued_puzzles(args, pending), args.jobs, \
+            args.chunksize, True, args.timeout, max_solutions, method, store):
+            failures += write_solve_record(out, verify, wanted, pending.popleft(), index, result)
+    finally:
+        if store is not None:
+            store.close()
+    return 1 if failures else 0
+
+
+def write_solve_record(out, verify, wanted, queued, index, result):
+    """Writes the JSON line of one solve or verify-unique result; returns 1 if the puzzle
+    did not get a wanted answer, else 0"""
+    source, grid = queued
+    record = {"index": index, "source": source}
+    if grid.metadata:
+        record["metadata"] = grid.metadata
+    record["status"] = result["status"]
+    solutions = [mask_string(masks, grid.numcols) for masks in result["solutions"]]
+    if verify:
+        record["unique"] = result["status"] == "unique"
+        if grid.key_array is not None and result["status"] == "unique":
+            record["matches_goal"] = solutions[0] == \
+                mask_string(grid.key_array.row_filled, grid.numcols)
+    else:
+        record["solutions"] = solutions
+    record["seconds"] = round(result["seconds"], 6)
+    if "stored" in result:
+        record["stored"] = result["stored"]
+    out.write(json.dumps(record, separators=(",", ":")) + "\n")
+    out.flush()
+    return int(result["status"] not in wanted or record.get("matches_goal") is False)
+
+
+def rate_command(args, out):
+    """rate: one JSON line per input puzzle with its rating, see nonograms.rating.rate"""
+    from .batch import Batch
+    pending = deque()
+    failures = 0
+    for index, result in Batch.rate(queued_puzzles(args, pending), args.jobs, args.chunksize, \
+        True, args.timeout):
+        source, grid = pending.popleft()
+        record = {"index": index, "source": source}
+        if grid.metadata:
+            record["metadata"] = grid.metadata
+        record.update(result)
+        record["seconds"] = round(result["seconds"], 6)
+        failures += result["status"] != "rated"
+        out.write(json.dumps(record, separators=(",", ":")) + "\n")
+        out.flush()
+    return 1 if failures else 0
+
+
+def generate_command(args, out):
+    """generate: args.count puzzles written as JSON Lines or .non"""
+    from .batch import Batch
+    from .formats import PuzzleIO
+    writer = PuzzleIO.write_non if args.output_format == "non" else PuzzleIO.write_jsonl
+    numcols = args.cols if args.cols is not None else args.rows
+    def specs():
+        for index in range(args.count):
+            yield {"numrows": args.rows, "numcols": numcols, "density": args.density,
+                   "difficulty": args.difficulty, "max_flips": args.max_flips,
+                   "seed": None if args.seed is None else args.seed + index}
+    failures = 0
+    store = open_store(args)
+    try:
+        for index, result in Batch.generate(specs(), args.jobs, args.chunksize, True, \
+            args.timeout, store):
+            if result["status"] != "generated":
+                print("puzzle %d: %s after %.3f s" % (index, result["status"], \
+                    result["seconds"]), file=sys.stderr)
+                failures += 1
+                continue
+            key_array = PackedArray.unpack((args.rows, numcols, result["solution"], \
+                tuple(~mask & ((1 << numcols) - 1) for mask in result["solution"])))
+            grid = Grid(args.rows, numcols, key_array, result["row_fill_lists"], \
+                result["col_fill_lists"])
+            grid.metadata = {"difficulty": args.difficulty}
+            if args.seed is not None:
+                grid.metadata["seed"] = str(args.seed + index)
+            writer(out, grid)
+            out.flush()
+    finally:
+        if store is not None:
+            store.close()
+    return 1 if failures else 0
+
+
+def bench_command(args, out):
+    from . import bench
+    bench.main(args.extra)
+    return 0
+
+
+def demo_command(args, out):
+    test = Grid(13, 13, PackedArray(13, 13, DEMO_KEY))
+    out.write(test.get_key_str() + "\n\n")
+    out.write(str(Grid.cap_guess(test.pub_array, test.row_fill_lists, \
+        test.col_fill_lists)[0]) + "\n\n")
+    out.write("%d\n%s\n" % (len(test.self_solve()), test.has_unique_solution()))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m nonograms", \
+        description="Solve, verify and generate nonograms in bulk")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    def add_store_option(subparser):
+        subparser.add_argument("--store", default=None, metavar="file",
+                               help="SQLite file of known puzzles and their solutions, "
+                               "created if missing")
+
+    def add_batch_options(subparser, chunksize):
+        subparser.add_argument("--jobs", "-j", type=int, default=1,
+                               help="worker processes (default 1, 0 for one per CPU)")
+        subparser.add_argument("--timeout", type=float, default=None,
+                               help="seconds allowed per puzzle (default unlimited)")
+        subparser.add_argument("--chunksize", type=int, default=chunksize,
+                               help="puzzles handed to a worker at a time (default %d)" % \
+                                   chunksize)
+
+    for name, help_text in (("solve", "solve puzzles, one JSON line of solutions each"),
+                            ("verify-unique", "check that each puzzle has exactly one solution"),
+                            ("rate", "rate puzzles by the techniques they need")):
+        subparser = commands.add_parser(name, help=help_text)
+        subparser.add_argument("inputs", nargs="*", default=["-"], metavar="file",
+                               help=".non or JSON Lines puzzle files (default stdin, \"-\")")
+        subparser.add_argument("--format", choices=FORMATS, default="auto",
+                               help="input format (default: from extension or content)")
+        if name == "solve":
+            subparser.add_argument("--max-solutions", type=int, default=2,
+                                   help="solutions to look for (default 2, enough to tell "
+                                   "unique from multiple)")
+            subparser.add_argument("--method", choices=("search", "sat", "line"),
+                                   default="search", help="\"sat\" uses the SAT backend "
+                                   "(needs pycosat), \"line\" runs line logic (cap_guess) only")
+        if name != "rate":
+            add_store_option(subparser)
+        add_batch_options(subparser, 32 if name == "rate" else 16)
+        subparser.set_defaults(handler=rate_command if name == "rate" else solve_command)
+
+    subparser = commands.add_parser("generate", help="generate uniquely solvable puzzles")
+    subparser.add_argument("--rows", type=int, required=True)
+    subparser.add_argument("--cols", type=int, default=None, help="(default: same as --rows)")
+    subparser.add_argument("--count", "-n", type=int, default=1)
+    subparser.add_argument("--density", type=float, default=None,
+                           help="probability of a filled key cell (default random)")
+    subparser.add_argument("--difficulty", choices=("line", "search"), default="line")
+    subparser.add_argument("--max-flips", type=int, default=None)
+    subparser.add_argument("--seed", type=int, default=None,
+                           help="puzzle i is generated from seed + i, whatever --jobs is")
+    subparser.add_argument("--output-format", choices=("jsonl", "non"), default="jsonl")
+    add_store_option(subparser)
+    add_batch_options(subparser, 4)
+    subparser.set_defaults(handler=generate_command)
+
+    subparser = commands.add_parser("bench", help="run the benchmark harness",
+                                    description="Runs python -m nonograms.bench; any further "
+                                    "arguments are passed on to it", add_help=False)
+    subparser.set_defaults(handler=bench_command)
+
+    subparser = commands.add_parser("demo", help="solve the 13x13 sample puzzle")
+    subparser.set_defaults(handler=demo_command)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    args.extra = extra
+    if args.extra and args.command != "bench":
+        parser.error("unrecognized arguments: %s" % " ".join(args.extra))
+    if "jobs" in args:
+        if args.jobs < 0:
+            parser.error("--jobs must not be negative")
+        args.jobs = args.jobs or None
+    try:
+        return args.handler(args, sys.stdout)
+    except BrokenPipeError:
+        return 0
+    except (ImportError, OSError, ValueError) as error:
+        print("%s: error: %s" % (parser.prog, error), file=sys.stderr)
+        return 2
@@ -0,0 +1,649 @@
+"""
+Grid representations: Filling objects, FillingArray and Row, and the bitmask PackedArray
+the solvers run on
+"""
+import random
+
+from . import line
+
+
+class Filling:
+    """An immutable object representing what fills each square of a Nonogram
+
+    Attributes -
+    type - 0 is an X, 1 is a filled square, 2 is Empty,
+           and 3 is the Error filling"""
+
+    types = ['X','Filled','Empty','Error']
+    comp_dict = {
+                (0,0):0, (1,1):1, (2,2):2, (3,3):3,
+                (0,2):0, (2,0):0, (1,2):1, (2,1):1,
+                (0,1):3, (1,0):3, (0,3):3, (3,0):3,
+                (1,3):3, (3,1):3, (2,3):3, (3,2):3
+                }
+
+    def __init__(self, type_index=2):
+        assert type_index in [0,1,2,3], "Not a valid type assignment"
+        self.type = type_index
+
+    def __str__(self):
+        return str(self.type)
+
+    def __eq__(self, other):
+        return self.type == other.get_type()
+
+    def __ne__(self, other):
+        return self.type != other.get_type()
+
+    def get_type(self):
+        return self.type
+
+    def get_name(self):
+        return Filling.types[self.type]
+
+    def is_set(self):
+        return self.type==0 or self.type==1
+
+    def compare(self, other):
+        return Filling(Filling.comp_dict[(self.type, other.get_type())])
+
+
+class FillingArray():
+    """
+    A 2-d rectangular list of lists containing Fillings. Meant to be mutable.
+
+    Attributes -
+    numrows - number of rows in the array
+    numcols - number of columns in the array
+    array   - 2-d list of Fillings
+    T       - another FillingArray instance that is the transpose of self
+    """
+
+    def __init__(self, numrows, numcols, type_array=None, gen_transpose=1):
+        """Creates a filling array with the specificed columns. If no seed array is given,
+        generates a random valid is_set Nonogram"""
+        self.numrows = numrows
+        self.numcols = numcols
+        if type_array is not None:
+            assert all([all([isinstance(element, int) for element in row]) \
+                for row in type_array]), "type_array elements must be integers"
+            self.array = [[Filling(filling_type) \
+                for filling_type in row] for row in type_array]
+        else: #Randomly fills with is_set fillings using Row methods
+            self.array = self.generate_grid(numrows, numcols)
+        self.T = None
+        if gen_transpose:
+            self.generate_transpose()
+
+    def __str__(self):
+        return_str = ""
+        for row in self.array:
+            return_str += str([filling.get_type() for filling in row])+"\n"
+        return return_str[:-1]
+
+    def get_dimensions(self):
+        return (self.numrows, self.numcols)
+
+    def get_filling(self, row, column):
+        return self.array[row][column]
+
+    def get_row(self, row_index):
+        assert -self.numrows<=row_index<self.numrows
+        return self.array[row_index]
+
+    def get_col(self, column_index):
+        assert -self.numcols<=column_index<self.numcols
+        return self.T.array[column_index]
+
+    def set_filling(self, type_or_filling, row, column):
+        insertion = type_or_filling
+        if isinstance(type_or_filling, int):
+            insertion = Filling(type_or_filling)
+        self.array[row][column] = insertion
+        self.T.array[column][row] = insertion
+
+    def set_row(self, row_or_filling_list, row_index):
+        insertion = row_or_filling_list #Row or a list of Fillings
+        if isinstance(row_or_filling_list, Row):
+            insertion = row_or_filling_list.get_row_list()
+        assert len(insertion) == self.numrows, "Wrong inserting row dimensions"
+        assert isinstance(row_index, int) and -self.numrows<=row_index<self.numrows
+        self.array[row_index] = insertion
+        for column_index in range(len(insertion)):
+            self.T.set_filling(insertion[column_index], column_index, row_index)
+
+    def set_col(self, row_or_filling_list, col_index):
+        self.array.T.set_row(row_or_filling_list, col_index)
+
+    def deep_copy(self):
+        type_array = [[self.array[row_index][column_index].get_type() \
+            for column_index in range(self.numcols)] \
+            for row_index in range(self.numrows)]
+        return FillingArray(self.numrows, self.numcols, type_array)
+
+    def generate_transpose(self):
+        transpose_type_array = []
+        for column_index in range(self.numcols):
+            transpose_type_array.append([self.array[row_index][column_index].get_type() \
+                for row_index in range(self.numrows)])
+        transpose = FillingArray(self.numcols, self.numrows, transpose_type_array, 0)
+        transpose.set_transpose(self)
+        self.set_transpose(transpose)
+
+    def set_transpose(self, transpose):
+        assert self.numcols==transpose.numrows and self.numrows==transpose.numcols, "Wrong dimensions of transpose"
+        self.T = transpose
+
+    @staticmethod
+    def generate_grid(numrows, numcols): #In the future, a density parameter could be added
+        """
+        Returns a randomly generated is_set 2d list of Fillings with the given dimensions
+        Represents a valid Nonogram key
+        """
+        return_array = [Row(numcols).get_row_list() for _ in range(numrows)]
+        for column in range(numcols):
+            if not Row.determine_fill_list([return_array[row][column] for row in range(numrows)]):
+                temp_row = random.randrange(numrows)
+                return_array[temp_row][column] = Filling(1)
+        return return_array
+
+    @staticmethod
+    def is_set(filling_array_or_row_or_row_list):
+        short = filling_array_or_row_or_row_list
+        if isinstance(short, FillingArray): #Rows are included, as a subclass
+            for row in short.array:
+                for filling in row:
+                    if not filling.is_set():
+                        return False
+            return True
+        #Otherwise we are dealing with a row_list
+        return all([i.is_set for i in short])
+
+    @staticmethod
+    def has_errors(filling_array_or_row_or_row_list):
+        short = filling_array_or_row_or_row_list
+        if isinstance(short, FillingArray): #Rows are included, as a subclass
+            for row in short:
+                for filling in row:
+                    if filling.get_type() == 3:
+                        return True
+            return False
+        #Otherwise we are dealing with a row_list
+        return any([i.get_type() == 3 for i in short])
+
+
+class Row(FillingArray):
+    """Type of FillingArray with only one row; still a 2-d list containing the FillingList"""
+
+    def __init__(self, length, row_type_list=None):
+        self.numrows = 1
+        self.numcols = length
+        if row_type_list is not None:
+            self.array = [[Filling(f) for f in row_type_list]]
+        else: #Randomly fills with is_set fillings using Row methods
+            self.fill_randomly()
+
+    def get_row_list(self):
+        return self.array[0]
+
+    def get_filling(self, index):
+        return self.array[0][index]
+
+    def set_filling(self, type_or_filling, index):
+        insertion = type_or_filling
+        if isinstance(type_or_filling, int):
+            insertion = Filling(type_or_filling)
+        self.array[0][index] = insertion
+
+    def set_row(self, row_or_filling_list, row_index):
+        assert False, "Rows cannot have their entire contents reset"
+
+    def generate_transpose(self):
+        assert False, "Rows do not support transposes"
+
+    def set_transpose(self, transpose):
+        assert False, "Rows do not support transposes"
+
+    def fill_randomly(self): #In the future, a density parameter could be added
+        self.array = [[Filling(random.randrange(2)) for _ in range(self.numcols)]]
+        self.set_filling(1, random.randrange(self.numcols)) # ensures at least one fill
+
+    @staticmethod
+    def compare_rows(r1, r2):
+        """
+        Outputs a list of fillings, of elementwise comparisons between
+        the two input fillings at each index
+        r1 and r2 can be either Rows or lists of Fillings
+        Must be of equal length in either case
+        """
+        temp1, temp2 = r1, r2
+        if isinstance(r1, Row):
+            temp1 = r1.get_row_list()
+        if isinstance(r2, Row):
+            temp2 = r2.get_row_list()
+        assert len(temp1) == len(temp2), "Compared rows must be the same size"
+        return [Filling.compare(temp1[i], temp2[i]) for i in range(len(temp1))]
+
+    @staticmethod
+    def determine_fill_list(row_or_filling_list): #O(n)
+        """Given an is_set Row or list of fillings, generates the corresponding fill_list"""
+        row_list = row_or_filling_list
+        if isinstance(row_or_filling_list, Row):
+            row_list = row_or_filling_list.get_row_list()
+        assert Row.is_set(row_list), "Not a set filling"
+        fill_list = []
+        temp_counter = 0
+        for index in range(len(row_list)):
+            if row_list[index].get_type() == 1:
+                temp_counter += 1
+            else:
+                if temp_counter:
+                    fill_list.append(temp_counter)
+                temp_counter = 0
+        if temp_counter:
+            fill_list.append(temp_counter)
+        return fill_list
+
+    @staticmethod
+    def reconstruct(length, fill_list):
+        """Creates a random Row of the given length that is consistent with the given fill_list"""
+        num_gaps = len(fill_list) + 1
+        add_pad_list = [0] * (num_gaps)
+        assert length - (sum(fill_list) + num_gaps - 2) >= 0, \
+            "Not enough space to construct minimal filling_list"
+        # The expression (sum(fill_list) + num_gaps - 2) is the minimum size of
+        # any row with the given fill_list. The difference between length and this
+        # Minimum is thus the number of buffer X's we can place throughout
+        for index in range(length - (sum(fill_list) + num_gaps - 2)):
+            add_pad_list[random.randrange(num_gaps)] += 1
+        return_list = [Filling(0)] * add_pad_list[0]
+        for index in range(len(fill_list)):
+            return_list = return_list + [Filling(1)] * fill_list[index] + \
+                          [Filling(0)] * (add_pad_list[index + 1] + 1)
+        return return_list[:-1]
+
+    @staticmethod
+    def does_satisfy(pub_row, expected_fill_list):
+        """Returns whether the expected_row_list matches given pub_row"""
+        return Row.is_set(pub_row) and Row.determine_fill_list(pub_row) == expected_fill_list
+
+    @staticmethod
+    def generate_candidates(pub_row, fill_list):
+        """
+        pub_row is a list of fillings (usually not is_set)
+        Recursively produces a list of all possible row_lists with the required
+        length (len(pub_row)) and fill_list, and such that any is_set fillings
+        in pub_row are retained
+        Returns [] if no valid arrangement satisfies
+
+        The recursion works on offsets into pub_row, and the room the remaining blocks need
+        (min_length of each suffix of fill_list) is computed once up front
+        """
+        #assert not Row.has_errors(pub_row)
+        types = [filling.get_type() for filling in pub_row]
+        length = len(types)
+        num_blocks = len(fill_list)
+        needed = [0] * (num_blocks + 1) # needed[block]: min_length(fill_list[block:])
+        for block in range(num_blocks - 1, -1, -1):
+            needed[block] = fill_list[block] + (needed[block + 1] + 1 if needed[block + 1] else 0)
+
+        def candidates(offset, block):
+            """The arrangements of blocks block onwards within pub_row[offset:]"""
+            if block == num_blocks:  # base case
+                if 1 in types[offset:]:
+                    return []
+                return [[Filling(0)] * (length - offset)]
+            # recursive case
+            if needed[block] > length - offset:
+                return []
+            return_list = []
+            first_val = fill_list[block]
+            temp_counter = 0
+            counting_down = False
+            count_down = first_val
+            for index in range(offset, length):
+                if types[index] == 1 or types[index] == 2:
+                    temp_counter += 1
+                elif types[index] == 0:
+                    temp_counter = 0
+                if types[index] == 1 or counting_down:
+                    counting_down = True
+                    count_down -= 1
+                if count_down < 0:
+                    break
+                if temp_counter >= first_val:
+                    first_part = [Filling(0)] * (index + 1 - first_val - offset) + \
+                        [Filling(1)] * first_val
+                    one_more = 0
+                    if index != length - 1:
+                        if types[index + 1] == 1:
+                            continue
+                        first_part = first_part + [Filling(0)]
+                        one_more = 1
+                    return_list = return_list + [first_part + candidate for candidate in
+                        candidates(index + 1 + one_more, block + 1)]
+            return [candidate for candidate in return_list if len(candidate) == length - offset]
+
+        return candidates(0, 0)
+
+    @staticmethod
+    def deduce(pub_row, fill_list):
+        """
+        Returns a 2-tuple: first val is an updated pub_row that retains all is_set entries while
+        replacing empty fillings with fills or x's iff those values are logically necessary
+        for the pub_row to have the potential of satisfying given fill_list.
+        The second value of the return tuple is a boolean representing whether the deduction is
+        impossible, i.e. that the given pub_row cannot possibly be filled to satisfy fill_list
+
+        Packs pub_row into bitmasks and runs Row.deduce_masks
+
+        Arguments:
+        pub_row - A row list
+        """
+        filled, crossed = Row.to_masks(pub_row)
+        new_filled, new_crossed, error = Row.deduce_masks(filled, crossed, len(pub_row), fill_list)
+        if error:
+            return pub_row, 1
+        return Row.from_masks(new_filled, new_crossed, len(pub_row)), 0
+
+    # The bitmask line solver lives in nonograms.line; Row keeps its historical names for it
+    deduce_masks = staticmethod(line.deduce_masks)
+    placement_tables = staticmethod(line.placement_tables)
+    mask_fill_list = staticmethod(line.mask_fill_list)
+
+    @staticmethod
+    def to_masks(row_or_filling_list):
+        """Returns the 2-tuple (filled, crossed) of bitmasks for a Row or list of Fillings,
+        bit i standing for index i"""
+        row_list = row_or_filling_list
+        if isinstance(row_or_filling_list, Row):
+            row_list = row_or_filling_list.get_row_list()
+        filled, crossed = 0, 0
+        for index in range(len(row_list)):
+            if row_list[index].get_type() == 1:
+                filled |= 1 << index
+            elif row_list[index].get_type() == 0:
+                crossed |= 1 << index
+        return filled, crossed
+
+    @staticmethod
+    def from_masks(filled, crossed, length):
+        """Inverse of Row.to_masks: returns a list of length Fillings"""
+        return [Filling(1) if filled >> index & 1 else Filling(0) if crossed >> index & 1 \
+            else Filling() for index in range(length)]
+
+    @staticmethod
+    def enumerate_deduce(pub_row, fill_list, trace=None):
+        """
+        Reference implementation of Row.deduce that folds together every arrangement from
+        Row.generate_candidates. Exponential in the worst case; kept as an oracle to check
+        the placement-table deduction against
+
+        Same arguments and return values as Row.deduce, plus an optional Trace that counts
+        candidates_enumerated
+        """
+        #assert all([e>0 for e in fill_list]), "Elements of fill_list must be positive integers"
+        #assert not Row.has_errors(pub_row), "An error was already present in given pub_row"
+        candidates = Row.generate_candidates(pub_row, fill_list)
+        if trace is not None:
+            trace.count("candidates_enumerated", len(candidates))
+        if len(candidates) == 0:
+            return pub_row, 1
+        deduction = [Filling()] * len(pub_row)
+        for candidate in candidates:
+            deduction = Row.compare_rows(deduction, candidate)
+        for column_index in range(len(deduction)):
+            if deduction[column_index].get_type()==3:
+                deduction[column_index] = Filling() #Errors only represent ambiguity; the preassumption is that there are
+                # No preexisting errors, and if a given pub_row is intractible, we expect generate_candidates
+                # To catch this through producing an empty candidates list, so error fillings are replaced
+                # With empty fillings
+        return deduction, 0
+
+    @staticmethod
+    def enumerate_deduce_masks(filled, crossed, length, fill_list, trace=None):
+        """Row.enumerate_deduce with the bitmask signature of Row.deduce_masks; bind trace with
+        functools.partial to count candidates when passing it as a line_solver"""
+        deduction, error = Row.enumerate_deduce(Row.from_masks(filled, crossed, length), \
+            fill_list, trace)
+        if error:
+            return filled, crossed, 1
+        return Row.to_masks(deduction) + (0,)
+
+
+class PackedArray:
+    """
+    A 2-d rectangular grid of filling types packed into integer bitmasks. Meant to be mutable.
+    Each row and each column is stored as a (filled, crossed) pair of ints, so both row and
+    column views cost nothing to produce and cells are compared with bitwise operations.
+    Bit i of a row's masks is column i; bit i of a column's masks is row i
+
+    Attributes -
+    numrows     - number of rows in the array
+    numcols     - number of columns in the array
+    row_filled  - numrows-length list of ints, bits set where cells are filled
+    row_crossed - numrows-length list of ints, bits set where cells are X's
+    col_filled  - numcols-length list of ints, transpose of row_filled
+    col_crossed - numcols-length list of ints, transpose of row_crossed
+    trail       - while a checkpoint is open, list of (is_row, index, filled, crossed)
+                  entries recording the previous masks of every line set_type, set_row
+                  and set_col changed, oldest first; None otherwise
+    checkpoints - list of the markers of the open checkpoints, innermost last
+    """
+
+    def __init__(self, numrows, numcols, type_array=None):
+        """Creates a packed array with the given dimensions, from a 2-d list of filling types
+        if given and entirely Empty otherwise"""
+        self.numrows = numrows
+        self.numcols = numcols
+        self.row_filled = [0] * numrows
+        self.row_crossed = [0] * numrows
+        self.col_filled = [0] * numcols
+        self.col_crossed = [0] * numcols
+        self.trail = None
+        self.checkpoints = []
+        if type_array is not None:
+            for row_index in range(numrows):
+                for column_index in range(numcols):
+                    self.set_type(type_array[row_index][column_index], row_index, column_index)
+
+    def __str__(self):
+        return "\n".join(str(row) for row in self.get_type_array())
+
+    def __eq__(self, other):
+        return isinstance(other, PackedArray) and \
+            self.get_dimensions() == other.get_dimensions() and \
+            self.row_filled == other.row_filled and self.row_crossed == other.row_crossed
+
+    def get_dimensions(self):
+        return (self.numrows, self.numcols)
+
+    def get_type(self, row, column):
+        if self.row_filled[row] >> column & 1:
+            return 1
+        if self.row_crossed[row] >> column & 1:
+            return 0
+        return 2
+
+    def get_type_array(self):
+        return [[self.get_type(row_index, column_index) for column_index in range(self.numcols)] \
+            for row_index in range(self.numrows)]
+
+    def get_row(self, row_index):
+        """Returns the (filled, crossed) masks of a row"""
+        return self.row_filled[row_index], self.row_crossed[row_index]
+
+    def get_col(self, column_index):
+        """Returns the (filled, crossed) masks of a column"""
+        return self.col_filled[column_index], self.col_crossed[column_index]
+
+    def set_type(self, type_index, row, column):
+        assert type_index in [0,1,2], "Not a valid type assignment"
+        if self.trail is not None and self.get_type(row, column) != type_index:
+            self.trail.append((True, row, self.row_filled[row], self.row_crossed[row]))
+        row_bit, column_bit = 1 << column, 1 << row
+        self.row_filled[row] &= ~row_bit
+        self.row_crossed[row] &= ~row_bit
+        self.col_filled[column] &= ~column_bit
+        self.col_crossed[column] &= ~column_bit
+        if type_index == 1:
+            self.row_filled[row] |= row_bit
+            self.col_filled[column] |= column_bit
+        elif type_index == 0:
+            self.row_crossed[row] |= row_bit
+            self.col_crossed[column] |= column_bit
+
+    def set_row(self, row_index, filled, crossed):
+        """Replaces the masks of a row, updating the crossing columns.
+        Returns the mask of cells whose type changed"""
+        changed = (filled ^ self.row_filled[row_index]) | (crossed ^ self.row_crossed[row_index])
+        if changed and self.trail is not None:
+            self.trail.append((True, row_index, self.row_filled[row_index], \
+                self.row_crossed[row_index]))
+        self.row_filled[row_index] = filled
+        self.row_crossed[row_index] = crossed
+        PackedArray.scatter(changed, row_index, filled, crossed, self.col_filled, self.col_crossed)
+        return changed
+
+    def set_col(self, column_index, filled, crossed):
+        """Replaces the masks of a column, updating the crossing rows.
+        Returns the mask of cells whose type changed"""
+        changed = (filled ^ self.col_filled[column_index]) | \
+            (crossed ^ self.col_crossed[column_index])
+        if changed and self.trail is not None:
+            self.trail.append((False, column_index, self.col_filled[column_index], \
+                self.col_crossed[column_index]))
+        self.col_filled[column_index] = filled
+        self.col_crossed[column_index] = crossed
+        PackedArray.scatter(changed, column_index, filled, crossed, self.row_filled, self.row_crossed)
+        return changed
+
+    def deep_copy(self):
+        copy = PackedArray(0, 0)
+        copy.numrows, copy.numcols = self.numrows, self.numcols
+        copy.row_filled, copy.row_crossed = self.row_filled[:], self.row_crossed[:]
+        copy.col_filled, copy.col_crossed = self.col_filled[:], self.col_crossed[:]
+        return copy
+
+    def get_state(self):
+        """Returns a snapshot of the array's contents for set_state; copies the mask lists only"""
+        return self.row_filled[:], self.row_crossed[:], self.col_filled[:], self.col_crossed[:]
+
+    def set_state(self, state):
+        """Restores contents saved by get_state. The snapshot may be restored more than once
+        Not recorded on the trail, so it must not be mixed with open checkpoints"""
+        assert self.trail is None, "set_state cannot be used while a checkpoint is open"
+        self.row_filled[:], self.row_crossed[:], self.col_filled[:], self.col_crossed[:] = state
+
+    def checkpoint(self):
+        """Opens a checkpoint and returns its marker for rollback. From then on every change
+        is recorded on the trail, so rolling back costs time in the number of lines changed
+        since, not in the size of the array. Checkpoints nest"""
+        if self.trail is None:
+            self.trail = []
+        marker = len(self.trail)
+        self.checkpoints.append(marker)
+        return marker
+
+    def rollback(self, marker):
+        """Undoes every change made since checkpoint returned marker, and closes that
+        checkpoint along with every checkpoint opened after it (of several opened with no
+        change in between, which share a marker, only the latest); the trail is dropped once
+        no checkpoint is open"""
+        checkpoints = self.checkpoints
+        while checkpoints and checkpoints[-1] > marker:
+            checkpoints.pop()
+        assert checkpoints and checkpoints[-1] == marker, "Not an open checkpoint"
+        checkpoints.pop()
+        trail = self.trail
+        while len(trail) > marker:
+            is_row, index, filled, crossed = trail.pop()
+            if is_row:
+                changed = (filled ^ self.row_filled[index]) | (crossed ^ self.row_crossed[index])
+                self.row_filled[index], self.row_crossed[index] = filled, crossed
+                PackedArray.scatter(changed, index, filled, crossed, self.col_filled, \
+                    self.col_crossed)
+            else:
+                changed = (filled ^ self.col_filled[index]) | (crossed ^ self.col_crossed[index])
+                self.col_filled[index], self.col_crossed[index] = filled, crossed
+                PackedArray.scatter(changed, index, filled, crossed, self.row_filled, \
+                    self.row_crossed)
+        if not checkpoints:
+            self.trail = None
+
+    def is_set(self):
+        full = (1 << self.numcols) - 1
+        return all((self.row_filled[row_index] | self.row_crossed[row_index]) == full \
+            for row_index in range(self.numrows))
+
+    def pack(self):
+        """Returns a compact picklable form of the array: its dimensions and row masks only"""
+        return (self.numrows, self.numcols, tuple(self.row_filled), tuple(self.row_crossed))
+
+    @staticmethod
+    def unpack(packed):
+        """Inverse of PackedArray.pack"""
+        numrows, numcols, row_filled, row_crossed = packed
+        array = PackedArray(numrows, numcols)
+        for row_index in range(numrows):
+            array.set_row(row_index, row_filled[row_index], row_crossed[row_index])
+        return array
+
+    def to_filling_array(self):
+        return FillingArray(self.numrows, self.numcols, self.get_type_array())
+
+    @staticmethod
+    def from_filling_array(filling_array):
+        return PackedArray(filling_array.numrows, filling_array.numcols, \
+            [[filling.get_type() for filling in row] for row in filling_array.array])
+
+    @staticmethod
+    def generate_key(numrows, numcols, density=None):
+        """
+        Returns a randomly generated is_set PackedArray with the given dimensions, built the same
+        way as FillingArray.generate_grid but without allocating any Fillings
+        Represents a valid Nonogram key
+
+        density is the probability of each cell being filled; None fills each cell by coin flip
+        """
+        assert density is None or 0 <= density <= 1, "density must be between 0 and 1"
+        key = PackedArray(numrows, numcols)
+        full = (1 << numcols) - 1
+        for row_index in range(numrows):
+            if density is None:
+                filled = random.getrandbits(numcols)
+            else:
+                filled = sum(1 << index for index in range(numcols) if random.random() < density)
+            filled |= 1 << random.randrange(numcols) # ensures at least one fill
+            key.set_row(row_index, filled, full & ~filled)
+        for column_index in range(numcols):
+            if not key.col_filled[column_index]:
+                key.set_type(1, random.randrange(numrows), column_index)
+        return key
+
+    @staticmethod
+    def scatter(changed, line_index, filled, crossed, cross_filled, cross_crossed):
+        """Copies the changed bits of one line's masks into the crossing lines' masks"""
+        line_bit = 1 << line_index
+        while changed:
+            low = changed & -changed
+            cross_index = low.bit_length() - 1
+            changed ^= low
+            if filled & low:
+                cross_filled[cross_index] |= line_bit
+            else:
+                cross_filled[cross_index] &= ~line_bit
+            if crossed & low:
+                cross_crossed[cross_index] |= line_bit
+            else:
+                cross_crossed[cross_index] &= ~line_bit
+
+    @staticmethod
+    def bit_indices(mask):
+        """Returns the list of indices of set bits in mask, in increasing order"""
+        indices = []
+        while mask:
+            low = mask & -mask
+            indices.append(low.bit_length() - 1)
+            mask ^= low
+        return indices
@@ -0,0 +1,178 @@
+"""
+Streaming readers and writers for .non and JSON Lines puzzle files. Loaded on first use of
+nonograms.PuzzleIO
+"""
+import json
+
+from .core import PackedArray
+from .grid import Grid
+
+
+class PuzzleIO:
+    """
+    Readers and writers for puzzle files. Readers are generators that parse one puzzle at a
+    time from any iterable of lines (an open file, sys.stdin, ...), so corpora of any size
+    stream through in constant memory; each puzzle comes out as a Grid, keyless unless the
+    file gives a goal
+
+    Formats -
+    .non   - the common text format: keyword lines (width, height, title, by, copyright,
+             catalogue, goal, ...), then "rows" and "columns" sections of one comma separated
+             clue per line ("0" for an empty line). A file may hold several puzzles, each
+             starting with its keyword lines
+    .jsonl - one JSON object per line with keys "rows" and "columns" (lists of fill_lists),
+             an optional "goal", and any other keys as metadata
+    A goal is a string of numrows * numcols 0s and 1s in row-major order
+    """
+
+    NON_SECTIONS = ("rows", "columns")
+
+    @staticmethod
+    def read(path):
+        """Yields the Grids of the file at path, choosing the format from its extension
+        (.jsonl or .json for JSON Lines, anything else is read as .non)"""
+        reader = PuzzleIO.read_jsonl if path.endswith((".jsonl", ".json")) else PuzzleIO.read_non
+        with open(path) as stream:
+            yield from reader(stream)
+
+    @staticmethod
+    def write(path, grids):
+        """Writes every Grid of the iterable grids to path, format chosen as in PuzzleIO.read.
+        Returns the number of puzzles written"""
+        writer = PuzzleIO.write_jsonl if path.endswith((".jsonl", ".json")) else PuzzleIO.write_non
+        count = 0
+        with open(path, "w") as stream:
+            for grid in grids:
+                writer(stream, grid)
+                count += 1
+        return count
+
+    @staticmethod
+    def read_non(lines):
+        """Yields a Grid for each puzzle in the .non formatted iterable of lines"""
+        puzzle = PuzzleIO.new_non_puzzle()
+        section = None
+        for line_number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                section = None
+                continue
+            if section is not None and line[0].isdigit():
+                try:
+                    puzzle[section].append([int(value) for value in \
+                        line.replace(",", " ").split() if value != "0"])
+                except ValueError:
+                    raise ValueError("Malformed clue on line %d: %r" % (line_number, line))
+                continue
+            section = None
+            keyword, _, value = line.partition(" ")
+            keyword, value = keyword.lower(), value.strip()
+            if keyword in PuzzleIO.NON_SECTIONS:
+                if puzzle[keyword]:
+                    raise ValueError("Repeated %s section on line %d" % (keyword, line_number))
+                section = keyword
+                continue
+            if puzzle["rows"] and puzzle["columns"] and \
+                (keyword != "goal" or puzzle["goal"] is not None):
+                # keywords after both sections, other than the puzzle's goal, start a new puzzle
+                yield PuzzleIO.build_grid(puzzle)
+                puzzle = PuzzleIO.new_non_puzzle()
+            if value.startswith('"') and value.endswith('"') and len(value) > 1:
+                value = value[1:-1]
+            if keyword in ("width", "height"):
+                try:
+                    puzzle[keyword] = int(value)
+                except ValueError:
+                    raise ValueError("Malformed %s on line %d: %r" % (keyword, line_number, line))
+            elif keyword == "goal":
+                puzzle["goal"] = value
+            else:
+                puzzle["metadata"][keyword] = value
+        if puzzle["rows"] or puzzle["columns"]:
+            yield PuzzleIO.build_grid(puzzle)
+
+    @staticmethod
+    def write_non(stream, grid):
+        """Writes grid to the text stream in .non format, followed by a blank line"""
+        for keyword, value in grid.metadata.items():
+            stream.write('%s "%s"\n' % (keyword, value))
+        stream.write("width %d\nheight %d\n\nrows\n" % (grid.numcols, grid.numrows))
+        for fill_list in grid.row_fill_lists:
+            stream.write((",".join(map(str, fill_list)) or "0") + "\n")
+        stream.write("\ncolumns\n")
+        for fill_list in grid.col_fill_lists:
+            stream.write((",".join(map(str, fill_list)) or "0") + "\n")
+        if grid.key_array is not None:
+            stream.write('\ngoal "%s"\n' % PuzzleIO.goal_string(grid.key_array))
+        stream.write("\n")
+
+    @staticmethod
+    def read_jsonl(lines):
+        """Yields a Grid for each non-blank line of the JSON Lines iterable of lines"""
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                raise ValueError("Malformed JSON on line %d" % line_number)
+            if not isinstance(record, dict) or "rows" not in record or "columns" not in record:
+                raise ValueError("Line %d needs \"rows\" and \"columns\" keys" % line_number)
+            puzzle = PuzzleIO.new_non_puzzle()
+            for section in PuzzleIO.NON_SECTIONS:
+                fill_lists = record.pop(section)
+                if not isinstance(fill_lists, list) or not all(isinstance(fill_list, list) \
+                    for fill_list in fill_lists):
+                    raise ValueError("\"%s\" on line %d must be a list of lists" % \
+                        (section, line_number))
+                # a lone 0 stands for an empty line, as in .non files
+                puzzle[section] = [[] if fill_list == [0] else fill_list \
+                    for fill_list in fill_lists]
+            puzzle["goal"] = record.pop("goal", None)
+            if puzzle["goal"] is not None and not isinstance(puzzle["goal"], str):
+                raise ValueError("\"goal\" on line %d must be a string" % line_number)
+            puzzle["metadata"] = record
+            try:
+                grid = PuzzleIO.build_grid(puzzle)
+            except ValueError as error:
+                raise ValueError("%s on line %d" % (error, line_number))
+            yield grid
+
+    @staticmethod
+    def write_jsonl(stream, grid):
+        """Writes grid to the text stream as one JSON line"""
+        record = dict(grid.metadata)
+        record["rows"], record["columns"] = grid.row_fill_lists, grid.col_fill_lists
+        if grid.key_array is not None:
+            record["goal"] = PuzzleIO.goal_string(grid.key_array)
+        stream.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    @staticmethod
+    def new_non_puzzle():
+        return {"width": None, "height": None, "rows": [], "columns": [], "goal": None,
+                "metadata": {}}
+
+    @staticmethod
+    def build_grid(puzzle):
+        """Returns the Grid described by a dict from PuzzleIO.new_non_puzzle, checking that its
+        declared dimensions, clues and goal agree"""
+        numrows, numcols = len(puzzle["rows"]), len(puzzle["columns"])
+        if puzzle["height"] not in (None, numrows) or puzzle["width"] not in (None, numcols):
+            raise ValueError("Puzzle declares %sx%s but has %d row and %d column clues" % \
+                (puzzle["width"], puzzle["height"], numrows, numcols))
+        grid = Grid.from_fill_lists(puzzle["rows"], puzzle["columns"]) # checks the clues
+        if puzzle["goal"] is not None:
+            goal = puzzle["goal"]
+            if len(goal) != numrows * numcols or set(goal) - set("01"):
+                raise ValueError("Goal must be %d characters of 0s and 1s" % (numrows * numcols))
+            key_array = PackedArray(numrows, numcols, [[int(goal[row_index * numcols + \
+                column_index]) for column_index in range(numcols)] for row_index in range(numrows)])
+            if not Grid.is_solved(key_array, grid.row_fill_lists, grid.col_fill_lists):
+                raise ValueError("Goal does not satisfy the clues")
+            grid.key_array = key_array
+        grid.metadata = puzzle["metadata"]
+        return grid
+
+    @staticmethod
+    def goal_string(key_array):
+        return "".join(str(type_index) for row in key_array.get_type_array() for type_index in row)
@@ -0,0 +1,197 @@
+"""
+Grid, the puzzle object, gathering the solver entry points as static methods
+"""
+import math
+
+from . import propagation, search
+from .core import FillingArray, PackedArray
+from .line import ClueIndex, mask_fill_list, min_length
+
+
+class Grid:
+    """
+    Represents a Nonogram Grid
+
+    Attributes:
+    numrows        - Number of rows in the Grid
+    numcols        - Size of each row in the list
+    key_array      - is_set PackedArray representing key of Grid, or None for a Grid built
+                     from fill_lists alone
+    pub_array      - PackedArray representing pub_rows of Grid
+    row_fill_lists - numrows-length list of fill_lists
+    col_fill_lists - numcols-length list of fill_lists
+    clue_index     - ClueIndex of the fill_lists, built once and passed to the solvers by
+                     self_solve and has_unique_solution
+    cycle_list     - list of ints representing each row and column in a special order
+                     useful for solving. See construct_cycle_list method for details
+    metadata       - dict of descriptive strings such as title and author, kept by PuzzleIO
+    """
+
+    def __init__(self, numrows, numcols, key_array=None, row_fill_lists=None, \
+        col_fill_lists=None):
+        """
+        Constructs a Grid with the given dimensions. If a key_array is provided,
+        set the Grid's key_array to it; else if row_fill_lists and col_fill_lists are provided,
+        the Grid has no key; else generate a random valid Nonogram key
+
+        Precondition: specified key_array and fill_lists must match dimensions
+        key_array is an is_set FillingArray or PackedArray
+        (a numrows element-list, each element being an
+        numcols-element list of is_set Fillings)"""
+        assert isinstance(numcols, int) and isinstance(numrows, int), \
+            "Dimensions must be integers"
+        assert numrows >= 0 and numcols >= 0, "Dimensions must be positive"
+        assert (row_fill_lists is None) == (col_fill_lists is None), \
+            "row_fill_lists and col_fill_lists must be given together"
+        self.numcols = numcols
+        self.numrows = numrows
+        if key_array is not None:
+            assert isinstance(key_array, (FillingArray, PackedArray)), \
+                "Given key_array must be a FillingArray or PackedArray"
+            assert key_array.get_dimensions() == (numrows, numcols), \
+                "Given key_array's dimensions do not match expected dimensions"
+            if isinstance(key_array, FillingArray):
+                key_array = PackedArray.from_filling_array(key_array)
+            assert key_array.is_set(), "Given key_array is not is_set"
+            self.key_array = key_array
+        elif row_fill_lists is not None:
+            self.key_array = None
+        else:
+            self.key_array = PackedArray.generate_key(numrows, numcols)
+        self.pub_array = PackedArray(numrows, numcols)
+        if row_fill_lists is not None:
+            assert len(row_fill_lists) == numrows and len(col_fill_lists) == numcols, \
+                "Given fill_lists do not match expected dimensions"
+            Grid.check_fill_lists(row_fill_lists, col_fill_lists)
+            self.row_fill_lists = [list(fill_list) for fill_list in row_fill_lists]
+            self.col_fill_lists = [list(fill_list) for fill_list in col_fill_lists]
+            if self.key_array is not None:
+                assert Grid.is_solved(self.key_array, self.row_fill_lists, \
+                    self.col_fill_lists), "Given key_array does not satisfy the fill_lists"
+        else:
+            self.row_fill_lists = [mask_fill_list(self.key_array.row_filled[row_index], \
+                numcols) for row_index in range(numrows)]
+            self.col_fill_lists = [mask_fill_list(self.key_array.col_filled[column_index], \
+                numrows) for column_index in range(numcols)]
+        self.clue_index = ClueIndex(self.row_fill_lists, self.col_fill_lists)
+        self.cycle_list = self.construct_cycle_list(numrows, numcols)
+        self.metadata = {}
+
+    @staticmethod
+    def from_fill_lists(row_fill_lists, col_fill_lists):
+        """Returns a keyless Grid for the given clues"""
+        return Grid(len(row_fill_lists), len(col_fill_lists), None, row_fill_lists, \
+            col_fill_lists)
+
+    @staticmethod
+    def check_fill_lists(row_fill_lists, col_fill_lists):
+        """Raises ValueError unless every block of the fill_lists is a positive int and every
+        fill_list fits in its line. Clues usually come from files, so unlike the other
+        preconditions this is checked even under python -O"""
+        for fill_lists, kind, length in ((row_fill_lists, "row", len(col_fill_lists)), \
+            (col_fill_lists, "column", len(row_fill_lists))):
+            for line_index, fill_list in enumerate(fill_lists):
+                if not all(isinstance(block, int) and not isinstance(block, bool) and \
+                    block > 0 for block in fill_list):
+                    raise ValueError("Clue of %s %d has a block that is not a positive "
+                                     "integer: %r" % (kind, line_index, fill_list))
+                if Grid.min_length(fill_list) > length:
+                    raise ValueError("Clue of %s %d does not fit in %d cells: %r" % \
+                        (kind, line_index, length, fill_list))
+
+    def __str__(self):
+        return str(self.pub_array)
+
+    def get_key_str(self):
+        return str(self.key_array) if self.key_array is not None else ""
+
+    def get_pub_array(self):
+        return self.pub_array
+
+    def get_key_array(self):
+        return self.key_array
+
+    def self_solve(self, max_solutions=None):
+        return Grid.solve(self.pub_array, self.row_fill_lists, \
+            self.col_fill_lists, max_solutions, index=self.clue_index)
+
+    def has_unique_solution(self):
+        return Grid.is_unique(self.pub_array, self.row_fill_lists, self.col_fill_lists, \
+            index=self.clue_index)
+
+    is_solved = staticmethod(propagation.is_solved)
+    cap_guess = staticmethod(propagation.cap_guess)
+    propagate = staticmethod(propagation.propagate)
+    probe = staticmethod(propagation.probe)
+    min_length = staticmethod(min_length)
+    solve = staticmethod(search.solve)
+    split = staticmethod(search.split)
+    count_solutions = staticmethod(search.count_solutions)
+    is_unique = staticmethod(search.is_unique)
+    choose_branch_cell = staticmethod(search.choose_branch_cell)
+
+    @staticmethod
+    def generate(*args, **kwargs):
+        """See nonograms.generator.generate, which is only imported on first use"""
+        from .generator import generate
+        return generate(*args, **kwargs)
+
+    @staticmethod
+    def rate(*args, **kwargs):
+        """See nonograms.rating.rate, which is only imported on first use"""
+        from .rating import rate
+        return rate(*args, **kwargs)
+
+    @staticmethod
+    def canonical_form(*args, **kwargs):
+        """See nonograms.store.canonical_form, which is only imported on first use"""
+        from .store import canonical_form
+        return canonical_form(*args, **kwargs)
+
+    @staticmethod
+    def solve_sat(*args, **kwargs):
+        """See nonograms.sat.solve, which needs pycosat and is only imported on first use"""
+        from .sat import solve
+        return solve(*args, **kwargs)
+
+    @staticmethod
+    def count_solutions_sat(*args, **kwargs):
+        """See nonograms.sat.count_solutions, which needs pycosat and is only imported on
+        first use"""
+        from .sat import count_solutions
+        return count_solutions(*args, **kwargs)
+
+    @staticmethod
+    def propagate_batched(*args, **kwargs):
+        """See nonograms.vectorized.propagate_batched, which needs NumPy and is only imported
+        on first use"""
+        from .vectorized import propagate_batched
+        return propagate_batched(*args, **kwargs)
+
+    @staticmethod
+    def cap_guess_batched(*args, **kwargs):
+        """See nonograms.vectorized.cap_guess_batched, which needs NumPy and is only imported
+        on first use"""
+        from .vectorized import cap_guess_batched
+        return cap_guess_batched(*args, **kwargs)
+
+    @staticmethod
+    def construct_cycle_list(numrows, numcols):
+        cycle_list = []
+        max_dim = max(numrows, numcols)
+        min_dim = min(numrows, numcols)
+        row_cycle_list = [math.ceil(index/2) if index%2 else -math.ceil(index/2) \
+            for index in range(numrows)]
+        col_cycle_list = [2*max_dim + math.ceil(index/2) if index%2 \
+            else 2*max_dim - math.ceil(index/2) \
+            for index in range(numcols)]
+        #Merge
+        for _ in range(min_dim):
+            cycle_list.append(row_cycle_list.pop(0))
+            cycle_list.append(col_cycle_list.pop(0))
+        if row_cycle_list:
+            cycle_list.extend(row_cycle_list)
+        else:
+            cycle_list.extend(col_cycle_list)
+        return cycle_list
+
@@ -0,0 +1,72 @@
+"""
+Opt-in instrumentation for the solvers
+"""
+import time
+
+
+class Trace:
+    """
+    Counters, timers and an optional per-round timeline gathered while solving. Solver
+    functions take a trace argument that defaults to None, in which case every hook is
+    skipped; pass a Trace to see where Grid.cap_guess, Grid.solve or Grid.generate spend
+    their effort, then dump it to JSON
+
+    Counters -
+    lines_deduced          - line deductions run by Grid.propagate
+    cells_fixed            - cells decided by those deductions
+    rounds                 - calls to Grid.propagate (or Grid.propagate_batched)
+    sweeps                 - batches of lines deduced together by Grid.propagate_batched
+    contradictions         - rounds that ended in a contradiction
+    probes                 - cells probed (assumed each way) by Grid.probe
+    probe_fixes            - cells probing decided
+    probe_cache_hits       - probes skipped as nothing they read had changed
+    branch_points          - guesses made by Grid.solve
+    backtracks             - guesses Grid.solve undid
+    solutions              - solutions Grid.solve found
+    cache_hits/cache_misses - lookups in a LineCache whose trace attribute is set
+    candidates_enumerated  - arrangements built by Row.enumerate_deduce
+    keys, flips            - random keys drawn and key cells flipped by Grid.generate
+    Maxima: queue_size (line queue of Grid.propagate) and search_depth (Grid.solve)
+    Timers, in seconds: propagate, deduce and solve
+
+    Attributes -
+    counters - dict from counter name to int
+    maxima   - dict from name to the largest value recorded
+    timers   - dict from timer name to accumulated seconds
+    timeline - list of one dict per propagation round, or None when not recorded
+    """
+
+    def __init__(self, timeline=False):
+        self.counters = {}
+        self.maxima = {}
+        self.timers = {}
+        self.timeline = [] if timeline else None
+        self.started = time.perf_counter()
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record_max(self, name, value):
+        if value > self.maxima.get(name, value - 1):
+            self.maxima[name] = value
+
+    def add_time(self, name, seconds):
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    def add_round(self, **values):
+        """Appends a timeline entry, stamped with the seconds since the Trace was made"""
+        if self.timeline is not None:
+            values["t"] = time.perf_counter() - self.started
+            self.timeline.append(values)
+
+    def to_dict(self):
+        trace = {"counters": dict(self.counters), "maxima": dict(self.maxima),
+                 "timers": dict(self.timers), "elapsed": time.perf_counter() - self.started}
+        if self.timeline is not None:
+            trace["timeline"] = list(self.timeline)
+        return trace
+
+    def dump(self, stream):
+        """Writes the trace to the text stream as JSON"""
+        import json
+        json.dump(self.to_dict(), stream, indent=1)
@@ -0,0 +1,374 @@
+"""
+Line solving on bitmasks: the placement-table deduction behind Row.deduce, clue helpers,
+ClueIndex, the per-line clue data of a puzzle, and LineCache, a bounded memo in front of any
+line solver
+"""
+import sys
+from collections import OrderedDict
+
+def deduce_masks(filled, crossed, length, fill_list, starts=None):
+    """
+    Bitmask form of Row.deduce. Returns a 3-tuple (filled, crossed, error) where filled and
+    crossed are the input masks extended with every logically necessary fill and X, and
+    error is 1 if no arrangement of fill_list is consistent with the input masks
+
+    Runs in O(length * len(fill_list)) using the placement tables built by
+    placement_tables, so no arrangement is ever constructed; each block is only tried at
+    the starts its bounds allow
+
+    Arguments:
+    filled   - int, bit i set iff cell i is known to be filled
+    crossed  - int, bit i set iff cell i is known to be an X
+    length   - number of cells in the row
+    fill_list - list of positive ints
+    starts   - optional list of (earliest, latest) bounds on the start of each block, which
+               every arrangement consistent with the masks must respect, such as a ClueIndex
+               keeps; by default the bounds of a blank row, see clue_starts
+    """
+    return deduce_starts(filled, crossed, length, fill_list, starts)[:3]
+
+
+def deduce_starts(filled, crossed, length, fill_list, starts=None):
+    """
+    deduce_masks, returning a 4-tuple (filled, crossed, error, starts) whose last element
+    is the list of (earliest, latest) starts of each block over the consistent arrangements,
+    as block_ranges gives, or None on an error. Those bounds hold for the line with any
+    further cells decided, so they can be passed back in to deduce it again
+    """
+    num_blocks = len(fill_list)
+    if starts is None:
+        starts = clue_starts(length, fill_list)
+    prefix, suffix = placement_tables(filled, crossed, length, fill_list, starts)
+    if not prefix[num_blocks][length]:
+        return filled, crossed, 1, None
+    can_fill = 0
+    new_starts = []
+    for block in range(num_blocks):
+        size = fill_list[block]
+        block_mask = (1 << size) - 1
+        earliest = latest = None
+        for start in range(starts[block][0], starts[block][1] + 1):
+            end = start + size
+            if crossed & (block_mask << start):
+                continue
+            if block == 0:
+                left = prefix[0][start]
+            else:
+                left = start > 0 and not filled >> (start - 1) & 1 and prefix[block][start - 1]
+            if not left:
+                continue
+            if block == num_blocks - 1:
+                right = suffix[num_blocks][end]
+            else:
+                right = end < length and not filled >> end & 1 and suffix[block + 1][end + 1]
+            if right:
+                can_fill |= block_mask << start
+                if earliest is None:
+                    earliest = start
+                latest = start
+        new_starts.append((earliest, latest))
+    can_x = 0
+    for index in range(length):
+        if filled >> index & 1:
+            continue
+        # an X at index lies in the gap before some block, after the previous block's end
+        for block in range(num_blocks + 1):
+            if block > 0 and index < new_starts[block - 1][0] + fill_list[block - 1]:
+                break
+            if block < num_blocks and index >= new_starts[block][1]:
+                continue
+            if prefix[block][index] and suffix[block][index + 1]:
+                can_x |= 1 << index
+                break
+    unknown = ~(filled | crossed) & ((1 << length) - 1)
+    return filled | (can_fill & ~can_x & unknown), crossed | (can_x & ~can_fill & unknown), \
+        0, new_starts
+
+
+def placement_tables(filled, crossed, length, fill_list, starts=None):
+    """
+    Returns a 2-tuple (prefix, suffix) of (len(fill_list)+1) x (length+1) boolean tables
+    prefix[j][i] - the first j blocks of fill_list can be placed within cells 0 to i-1,
+                   with every other cell of that range an X
+    suffix[j][i] - blocks j onwards of fill_list can be placed within cells i to the end,
+                   with every other cell of that range an X
+    filled and crossed are the bitmasks of a row, as in deduce_masks. With starts, as in
+    deduce_masks, placements outside the bounds are left out, so entries only reachable
+    through them are False; combining a prefix with a suffix still gives every arrangement
+    """
+    num_blocks = len(fill_list)
+    if starts is None:
+        starts = clue_starts(length, fill_list)
+    prefix = [[False] * (length + 1) for _ in range(num_blocks + 1)]
+    prefix[0][0] = True
+    for index in range(length):
+        prefix[0][index + 1] = prefix[0][index] and not filled >> index & 1
+    for block in range(1, num_blocks + 1):
+        size = fill_list[block - 1]
+        block_mask = (1 << size) - 1
+        row, prev = prefix[block], prefix[block - 1]
+        earliest, latest = starts[block - 1]
+        for end in range(earliest + size, length + 1):
+            if row[end - 1] and not filled >> (end - 1) & 1:
+                row[end] = True
+                continue
+            start = end - size
+            if start > latest or crossed & (block_mask << start):
+                continue
+            if block == 1:
+                row[end] = prev[start]
+            else:
+                row[end] = start > 0 and not filled >> (start - 1) & 1 and prev[start - 1]
+    suffix = [[False] * (length + 1) for _ in range(num_blocks + 1)]
+    suffix[num_blocks][length] = True
+    for index in range(length - 1, -1, -1):
+        suffix[num_blocks][index] = suffix[num_blocks][index + 1] and not filled >> index & 1
+    for block in range(num_blocks - 1, -1, -1):
+        size = fill_list[block]
+        block_mask = (1 << size) - 1
+        row, nxt = suffix[block], suffix[block + 1]
+        earliest, latest = starts[block]
+        for start in range(latest, -1, -1):
+            if row[start + 1] and not filled >> start & 1:
+                row[start] = True
+                continue
+            end = start + size
+            if start < earliest or crossed & (block_mask << start):
+                continue
+            if block == num_blocks - 1:
+                row[start] = nxt[end]
+            else:
+                row[start] = end < length and not filled >> end & 1 and nxt[end + 1]
+    return prefix, suffix
+
+
+def block_ranges(filled, crossed, length, fill_list, starts=None):
+    """
+    Returns a list of (earliest, latest) start positions, one per block of fill_list, over
+    the arrangements consistent with the filled and crossed masks, or None if there is no
+    such arrangement. Every start in between is not necessarily possible, but no start
+    outside is. Uses the placement tables, as deduce_masks does, within the optional
+    starts bounds
+    """
+    return deduce_starts(filled, crossed, length, fill_list, starts)[3]
+
+
+def clue_starts(length, fill_list):
+    """Returns the (earliest, latest) start of each block of fill_list on a blank row: packed
+    to the left, then shifted right by the row's slack"""
+    slack = length - min_length(fill_list)
+    starts = []
+    earliest = 0
+    for size in fill_list:
+        starts.append((earliest, earliest + slack))
+        earliest += size + 1
+    return starts
+
+
+def overlap_masks(filled, crossed, length, fill_list):
+    """
+    The simple overlap rule, a weaker line solver with the signature of deduce_masks: each
+    block is pushed as far left and as far right as the X cells allow, ignoring filled cells
+    A cell both extremes of the same block cover is filled, and a cell no block can reach
+    is an X. Used to grade puzzles by the techniques they need, see nonograms.rating
+    """
+    lefts = leftmost_starts(crossed, length, fill_list)
+    rights = leftmost_starts(reverse_mask(crossed, length), length, fill_list[::-1])
+    if lefts is None or rights is None:
+        return filled, crossed, 1
+    must_fill = may_fill = 0
+    for left, right, size in zip(lefts, reversed(rights), fill_list):
+        right = length - right - size # from the reversed line back to a start position
+        may_fill |= ((1 << (right + size - left)) - 1) << left
+        if right < left + size:
+            must_fill |= ((1 << (left + size - right)) - 1) << right
+    if filled & ~may_fill:
+        return filled, crossed, 1
+    unknown = ~(filled | crossed) & ((1 << length) - 1)
+    return filled | (must_fill & unknown), crossed | (~may_fill & unknown), 0
+
+
+def leftmost_starts(crossed, length, fill_list):
+    """Returns the start of each block of fill_list packed as far left as the X cells of
+    crossed allow, or None if the blocks do not fit"""
+    starts = []
+    start = 0
+    for size in fill_list:
+        block_mask = (1 << size) - 1
+        while start + size <= length and crossed & (block_mask << start):
+            start += 1
+        if start + size > length:
+            return None
+        starts.append(start)
+        start += size + 1
+    return starts
+
+
+def reverse_mask(mask, length):
+    """Returns mask with its lowest length bits in reverse order"""
+    return int(format(mask, "0%db" % length)[::-1], 2) if length else 0
+
+
+def mask_fill_list(filled, length):
+    """Bitmask form of Row.determine_fill_list, for the filled mask of an is_set row"""
+    fill_list = []
+    temp_counter = 0
+    for index in range(length):
+        if filled >> index & 1:
+            temp_counter += 1
+        else:
+            if temp_counter:
+                fill_list.append(temp_counter)
+            temp_counter = 0
+    if temp_counter:
+        fill_list.append(temp_counter)
+    return fill_list
+
+
+def min_length(fill_list):
+    """Returns the length of the shortest row satisfying fill_list"""
+    return sum(fill_list) + len(fill_list) - 1 if fill_list else 0
+
+
+class ClueIndex:
+    """
+    What the clues say about each line, derived once per puzzle, plus start bounds for each
+    block narrowed as the line's cells get decided. Lines are numbered rows first, then
+    columns, as in propagate
+
+    The start bounds from a deduction hold for every later state of the line with at least
+    the same cells decided, so deduce starts from the bounds last found rather than from the
+    whole line whenever they still apply; after a rollback to an earlier state they no longer
+    do, and the blank-line bounds are used until the line is deduced again
+
+    propagate, probe and search.solve take their slacks and bounds from one, and the SAT
+    encoder its block ranges (see nonograms.sat.encode)
+
+    Attributes -
+    numrows     - number of rows; lines numrows on are columns
+    lengths     - list of the number of cells in each line
+    fill_lists  - list of each line's fill_list, as a tuple
+    min_lengths - list of each line's min_length
+    slacks      - list of each line's free cells, its length minus its min_length
+    starts      - list per line of the (earliest, latest) start of each block on a blank
+                  line, as clue_starts gives
+    narrowed    - dict from line to (filled, crossed, starts): the start bounds found by
+                  the line's last deduction and the masks it was deduced from
+    """
+
+    def __init__(self, row_fill_lists, col_fill_lists):
+        self.numrows = len(row_fill_lists)
+        numcols = len(col_fill_lists)
+        self.lengths = [numcols] * self.numrows + [self.numrows] * numcols
+        self.fill_lists = [tuple(fill_list) for fill_list in row_fill_lists] + \
+            [tuple(fill_list) for fill_list in col_fill_lists]
+        self.min_lengths = [min_length(fill_list) for fill_list in self.fill_lists]
+        self.slacks = [length - needed for length, needed in zip(self.lengths, self.min_lengths)]
+        self.starts = [clue_starts(length, fill_list) \
+            for length, fill_list in zip(self.lengths, self.fill_lists)]
+        self.narrowed = {}
+
+    def get_starts(self, line, filled, crossed):
+        """Returns the tightest start bounds known to hold for line in the state given by
+        its filled and crossed masks"""
+        known = self.narrowed.get(line)
+        if known is not None and not (known[0] & ~filled or known[1] & ~crossed):
+            return known[2]
+        return self.starts[line]
+
+    def deduce(self, line, filled, crossed):
+        """deduce_masks for line within its narrowed start bounds, keeping the bounds the
+        deduction finds. Returns (filled, crossed, error) as deduce_masks does"""
+        filled, crossed, error, starts = deduce_starts(filled, crossed, self.lengths[line], \
+            self.fill_lists[line], self.get_starts(line, filled, crossed))
+        if not error:
+            self.narrowed[line] = (filled, crossed, starts)
+        return filled, crossed, error
+
+    def solver(self, line_solver=deduce_masks):
+        """Returns a function (line, filled, crossed) -> line_solver's result for that line;
+        deduce_masks itself is run through deduce, so that it gets the narrowed bounds"""
+        if line_solver is deduce_masks:
+            return self.deduce
+        lengths, fill_lists = self.lengths, self.fill_lists
+        return lambda line, filled, crossed: \
+            line_solver(filled, crossed, lengths[line], fill_lists[line])
+
+
+class LineCache:
+    """
+    A bounded least-recently-used memo in front of a line solver. Entries are keyed on
+    (length, filled, crossed, fill_tuple), so the same partial row and fill_list share one
+    deduction across lines, propagation rounds and search branches
+
+    Pass the bound method deduce wherever a line_solver is accepted, e.g.
+    Grid.cap_guess(pub_array, row_fill_lists, col_fill_lists, cache.deduce)
+
+    Attributes -
+    line_solver - wrapped function with the signature of deduce_masks
+    max_entries - maximum number of cached deductions, or None for no limit
+    max_bytes   - approximate memory cap for cached keys and values, or None for no limit
+    size_bytes  - approximate memory currently held by cached keys and values
+    hits        - number of deductions answered from the cache
+    misses      - number of deductions passed to line_solver
+    evictions   - number of entries dropped to respect the caps
+    trace       - optional Trace that also counts cache_hits and cache_misses
+    """
+
+    def __init__(self, max_entries=100000, max_bytes=None, line_solver=deduce_masks):
+        assert max_entries is None or max_entries > 0, "max_entries must be positive"
+        assert max_bytes is None or max_bytes > 0, "max_bytes must be positive"
+        self.line_solver = line_solver
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.trace = None
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def deduce(self, filled, crossed, length, fill_list):
+        """deduce_masks, answered from the cache when possible"""
+        key = (length, filled, crossed, tuple(fill_list))
+        value = self.entries.get(key)
+        if value is not None:
+            self.hits += 1
+            if self.trace is not None:
+                self.trace.count("cache_hits")
+            self.entries.move_to_end(key)
+            return value
+        self.misses += 1
+        if self.trace is not None:
+            self.trace.count("cache_misses")
+        value = self.line_solver(filled, crossed, length, fill_list)
+        self.entries[key] = value
+        self.size_bytes += LineCache.entry_size(key, value)
+        while (self.max_entries is not None and len(self.entries) > self.max_entries) or \
+            (self.max_bytes is not None and self.size_bytes > self.max_bytes and self.entries):
+            old_key, old_value = self.entries.popitem(last=False)
+            self.size_bytes -= LineCache.entry_size(old_key, old_value)
+            self.evictions += 1
+        return value
+
+    def clear(self):
+        """Drops every entry; statistics are kept"""
+        self.entries.clear()
+        self.size_bytes = 0
+
+    def get_stats(self):
+        """Returns a dict of the cache's counters and current size"""
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "entries": len(self.entries), "size_bytes": self.size_bytes,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    @staticmethod
+    def entry_size(key, value):
+        """Approximate bytes held by one entry: both tuples and the ints they own"""
+        return sys.getsizeof(key) + sys.getsizeof(key[1]) + sys.getsizeof(key[2]) + \
+            sys.getsizeof(key[3]) + sys.getsizeof(value) + \
+            sys.getsizeof(value[0]) + sys.getsizeof(value[1])
@@ -0,0 +1,261 @@
+"""
+Propagation: repeatedly deducing rows and columns until nothing changes
+"""
+import heapq
+import time
+
+from .core import FillingArray, PackedArray
+from .line import ClueIndex, deduce_masks, mask_fill_list
+
+def is_solved(pub_array, row_fill_lists, col_fill_lists):
+    """Returns whether every row and column of the PackedArray pub_array is set
+    and satisfies its fill_list"""
+    if not pub_array.is_set():
+        return False
+    for row_index in range(pub_array.numrows):
+        if mask_fill_list(pub_array.row_filled[row_index], pub_array.numcols) != \
+            row_fill_lists[row_index]:
+            return False
+    for column_index in range(pub_array.numcols):
+        if mask_fill_list(pub_array.col_filled[column_index], pub_array.numrows) != \
+            col_fill_lists[column_index]:
+            return False
+    return True
+
+
+def cap_guess(pub_array, row_fill_lists, col_fill_lists, line_solver=deduce_masks, \
+    trace=None, level="line", index=None):
+    """
+    Returns a 2-tuple. First element is an updated (or solved) pub_array using the fill_lists
+    Second element is an error boolean, 1 if there was an intractibility between the input
+    pub_array and the fill_lists
+
+    Does not mutate input array. A FillingArray pub_array is packed before solving and the
+    result is returned as a FillingArray
+
+    Uses a queue system to deduce and update using naive Row deductions and returns either
+    a solved or semi-solved grid based on whether the deductions can be brought to completion
+    The queue system also maximizes the information received from deductions, since Rows are only
+    updated when new information from opposite direction Rows has been added to them
+
+    Arguments:
+    pub_array      - PackedArray representing public array
+    row_fill_lists - list of lists; row_fillings for each row
+    col_fill_lists - list of lists; col_fillings for each col
+    line_solver    - function with the signature of deduce_masks used on each row and col;
+                     Row.enumerate_deduce_masks can be passed to cross-check against enumeration,
+                     and the deduce method of a LineCache to memoize deductions
+    trace          - optional Trace, see propagate
+    level          - "line", or "probe" to also fix the cells probe can decide, see propagate
+    index          - optional ClueIndex of the fill_lists, see propagate
+    Precondition: correct dimensions
+    """
+    if isinstance(pub_array, FillingArray):
+        return_array, error = cap_guess(PackedArray.from_filling_array(pub_array), \
+            row_fill_lists, col_fill_lists, line_solver, trace, level, index)
+        return return_array.to_filling_array(), error
+    if pub_array.is_set():
+        return pub_array, not is_solved(pub_array, row_fill_lists, col_fill_lists)
+    return_array = pub_array.deep_copy()
+    return return_array, propagate(return_array, row_fill_lists, col_fill_lists, \
+        line_solver=line_solver, trace=trace, level=level, index=index)
+
+
+LEVELS = ("line", "probe")
+
+
+def propagate(array, row_fill_lists, col_fill_lists, rows=None, cols=None, \
+    line_solver=deduce_masks, solved_states=None, trace=None, level="line", probe_cache=None, \
+    index=None):
+    """
+    In-place form of cap_guess: deduces on the PackedArray array until no row or
+    column changes, and returns 1 if a contradiction was found, else 0. array is left
+    partially updated after a contradiction
+
+    Lines wait on a priority queue: every cell a deduction changes pushes only the crossing
+    line, and the line with the most changed cells since it was last deduced goes first,
+    ties going to the line with the least slack. Lines are numbered rows first, then columns,
+    as in ClueIndex
+
+    Arguments:
+    rows, cols    - indices of the lines to deduce first (by default, all of them);
+                    other lines are only deduced once a crossing line changes one of their cells
+    solved_states - optional dict from line number to the (filled, crossed) masks the line was
+                    last deduced to; a queued line still in that state is skipped. Callers
+                    that propagate repeatedly on the same fill_lists can pass the same dict
+    trace         - optional Trace; counts a round with its lines deduced, cells fixed and
+                    queue size
+    level         - "line" for line logic alone, or "probe" to follow it with probe
+    probe_cache   - dict passed on to probe; callers probing the same puzzle repeatedly
+                    can pass the same dict
+    index         - optional ClueIndex of the fill_lists, giving the slacks, and with the
+                    default line_solver the narrowed start bounds each line is deduced
+                    within (see ClueIndex.solver); built on each call if not given, so
+                    callers that propagate repeatedly on the same fill_lists should pass one
+    """
+    assert level in LEVELS, "level must be one of %s" % (LEVELS,)
+    if index is None:
+        index = ClueIndex(row_fill_lists, col_fill_lists)
+    if level == "probe":
+        return propagate(array, row_fill_lists, col_fill_lists, rows, cols, line_solver, \
+            solved_states, trace, index=index) or probe(array, row_fill_lists, \
+            col_fill_lists, line_solver, probe_cache, trace, index)
+    solve_line = index.solver(line_solver)
+    if trace is None:
+        return propagate_lines(array, index, rows, cols, solve_line, solved_states)
+    started = time.perf_counter()
+    round_counts = {"lines": 0, "cells_fixed": 0, "max_queue": 0}
+    def traced_solver(line, filled, crossed):
+        solver_started = time.perf_counter()
+        new_filled, new_crossed, error = solve_line(line, filled, crossed)
+        trace.add_time("deduce", time.perf_counter() - solver_started)
+        round_counts["lines"] += 1
+        round_counts["cells_fixed"] += \
+            bin((new_filled ^ filled) | (new_crossed ^ crossed)).count("1")
+        return new_filled, new_crossed, error
+    error = propagate_lines(array, index, rows, cols, traced_solver, solved_states, \
+        round_counts)
+    trace.add_time("propagate", time.perf_counter() - started)
+    trace.count("rounds")
+    trace.count("contradictions", error)
+    trace.count("lines_deduced", round_counts["lines"])
+    trace.count("cells_fixed", round_counts["cells_fixed"])
+    trace.record_max("queue_size", round_counts["max_queue"])
+    trace.add_round(error=error, **round_counts)
+    return error
+
+
+def propagate_lines(array, index, rows, cols, solve_line, solved_states, round_counts=None):
+    """propagate without the tracing, deducing lines with solve_line(line, filled, crossed)
+    (see ClueIndex.solver); round_counts, if given, is a dict whose "max_queue" entry is kept
+    at the largest size the line queue reached"""
+    numrows, numcols = array.numrows, array.numcols
+    if solved_states is None:
+        solved_states = {}
+    slacks = index.slacks
+    seeds = list(range(numrows) if rows is None else rows) + \
+        [numrows + column_index for column_index in (range(numcols) if cols is None else cols)]
+    pending = dict.fromkeys(seeds, 0) # line -> cells changed since the line was queued
+    heap = [(0, slacks[line], line) for line in pending]
+    heapq.heapify(heap)
+    while heap:
+        negative_count, _, line = heapq.heappop(heap)
+        if pending.get(line) != -negative_count: # superseded by a later push
+            continue
+        del pending[line]
+        if line < numrows:
+            line_index, offset = line, numrows
+            filled, crossed = array.get_row(line_index)
+            set_line = array.set_row
+        else:
+            line_index, offset = line - numrows, 0
+            filled, crossed = array.get_col(line_index)
+            set_line = array.set_col
+        if solved_states.get(line) == (filled, crossed):
+            continue
+        filled, crossed, error = solve_line(line, filled, crossed)
+        if error:
+            return 1
+        solved_states[line] = (filled, crossed)
+        for cross_index in PackedArray.bit_indices(set_line(line_index, filled, crossed)):
+            cross_line = cross_index + offset
+            count = pending.get(cross_line, 0) + 1
+            pending[cross_line] = count
+            heapq.heappush(heap, (-count, slacks[cross_line], cross_line))
+        if round_counts is not None and len(pending) > round_counts["max_queue"]:
+            round_counts["max_queue"] = len(pending)
+    return 0
+
+
+def probe(array, row_fill_lists, col_fill_lists, line_solver=deduce_masks, cache=None, \
+    trace=None, index=None):
+    """
+    Single-cell probing on a PackedArray array that line logic has settled: each undecided
+    cell is assumed filled and then an X, propagating after each assumption. If one
+    assumption leads to a contradiction the cell takes the other value, if both do the
+    puzzle is contradictory, and otherwise every cell both assumptions decided the same way
+    is fixed. Each fix is propagated, and cells are probed again until a full pass decides
+    nothing. Returns 1 if a contradiction was found, else 0; array is modified in place
+
+    Every assumption is undone by rolling array back to a checkpoint. A probe that decides
+    nothing is remembered in cache, a dict from (row, column) to the lines its propagations
+    deduced and their states beforehand; propagation reads no other line, so the cell is
+    only probed again once one of those lines has changed
+
+    trace is an optional Trace, which also counts probes, probe_fixes (cells fixed) and
+    probe_cache_hits; index is an optional ClueIndex, see propagate
+    """
+    if cache is None:
+        cache = {}
+    if index is None:
+        index = ClueIndex(row_fill_lists, col_fill_lists)
+    numrows, numcols = array.numrows, array.numcols
+    full = (1 << numcols) - 1
+    progress = True
+    while progress:
+        progress = False
+        for row in range(numrows):
+            for column in PackedArray.bit_indices(full & ~(array.row_filled[row] | \
+                array.row_crossed[row])):
+                if array.get_type(row, column) != 2: # fixed earlier in this pass
+                    continue
+                footprint = cache.get((row, column))
+                if footprint is not None and all(line_state(array, numrows, line) == state \
+                    for line, state in footprint):
+                    if trace is not None:
+                        trace.count("probe_cache_hits")
+                    continue
+                if trace is not None:
+                    trace.count("probes")
+                outcomes, footprint = [], {}
+                for type_index in (1, 0):
+                    marker = array.checkpoint()
+                    array.set_type(type_index, row, column)
+                    deduced = {}
+                    if propagate(array, row_fill_lists, col_fill_lists, [row], [column], \
+                        line_solver, deduced, trace, index=index):
+                        outcomes.append(None)
+                    else:
+                        outcomes.append((array.row_filled[:], array.row_crossed[:]))
+                    array.rollback(marker)
+                    for line in deduced:
+                        footprint[line] = line_state(array, numrows, line)
+                filled_outcome, crossed_outcome = outcomes
+                if filled_outcome is None and crossed_outcome is None:
+                    return 1
+                if filled_outcome is None:
+                    fixes = [(row, 0, 1 << column)]
+                elif crossed_outcome is None:
+                    fixes = [(row, 1 << column, 0)]
+                else: # the cells both assumptions decided the same way
+                    fixes = []
+                    for row_index in range(numrows):
+                        unknown = full & ~(array.row_filled[row_index] | \
+                            array.row_crossed[row_index])
+                        filled = filled_outcome[0][row_index] & crossed_outcome[0][row_index] \
+                            & unknown
+                        crossed = filled_outcome[1][row_index] & crossed_outcome[1][row_index] \
+                            & unknown
+                        if filled or crossed:
+                            fixes.append((row_index, filled, crossed))
+                    if not fixes:
+                        cache[(row, column)] = tuple(footprint.items())
+                        continue
+                changed_cols = 0
+                for row_index, filled, crossed in fixes:
+                    changed_cols |= array.set_row(row_index, array.row_filled[row_index] | \
+                        filled, array.row_crossed[row_index] | crossed)
+                    if trace is not None:
+                        trace.count("probe_fixes", bin(filled | crossed).count("1"))
+                if propagate(array, row_fill_lists, col_fill_lists, \
+                    [row_index for row_index, _, _ in fixes], \
+                    PackedArray.bit_indices(changed_cols), line_solver, None, trace, \
+                    index=index):
+                    return 1
+                progress = True
+    return 0
+
+
+def line_state(array, numrows, line):
+    """Returns the (filled, crossed) masks of line, numbered as in propagate"""
+    return array.get_row(line) if line < numrows else array.get_col(line - numrows)
@@ -0,0 +1,71 @@
+"""
+Difficulty rating by the deduction techniques a puzzle needs. Loaded on first use of
+Grid.rate
+"""
+from .core import PackedArray
+from .instrument import Trace
+from .line import ClueIndex, LineCache, overlap_masks
+from .propagation import is_solved, probe, propagate
+from .search import solve
+
+LEVELS = ("overlap", "line", "probe", "search")
+
+
+def rate(row_fill_lists, col_fill_lists, line_solver=None, deadline=None):
+    """
+    Solves the puzzle from a blank grid with techniques of increasing strength, each run
+    until it stalls before the next is tried, and returns a dict with keys
+    level        - the strongest technique needed: "overlap" (the simple overlap rule of
+                   overlap_masks), "line" (full line solving), "probe" (single-cell probing,
+                   see probe) or "search" (backtracking, see solve)
+    steps        - dict from each level to the work it did: cells fixed for overlap and
+                   line, cells probing decided directly for probe (their consequences are
+                   not counted), and guesses (branch points) for search
+    probes       - cells probed
+    search_depth - deepest stack of guesses the search needed
+    solutions    - 0, 1 or 2 (meaning at least 2); a puzzle settled below the search level
+                   is uniquely solvable, as every cell was forced
+    score        - a number for sorting puzzles by difficulty: the index of level in LEVELS,
+                   plus a fraction in [0, 1) that grows with the steps taken at that level
+
+    When a level finds a contradiction, level is that level and solutions is 0
+
+    Arguments:
+    line_solver - as in cap_guess, for the line, probe and search levels; defaults to the
+                  deduce method of a fresh LineCache
+    deadline    - as in solve; TimeoutError is raised once it passes
+    """
+    if line_solver is None:
+        line_solver = LineCache().deduce
+    numrows, numcols = len(row_fill_lists), len(col_fill_lists)
+    array = PackedArray(numrows, numcols)
+    index = ClueIndex(row_fill_lists, col_fill_lists)
+    rating = {"level": None, "steps": dict.fromkeys(LEVELS, 0), "probes": 0,
+              "search_depth": 0, "solutions": 1, "score": 0.0}
+    for level in LEVELS:
+        rating["level"] = level
+        trace = Trace()
+        if level == "search":
+            solutions = solve(array, row_fill_lists, col_fill_lists, 2, line_solver, \
+                deadline, None, trace, index=index)
+            rating["steps"]["search"] = trace.counters.get("branch_points", 0)
+            rating["search_depth"] = trace.maxima.get("search_depth", 0)
+            rating["solutions"] = len(solutions)
+            break
+        if level == "probe":
+            error = probe(array, row_fill_lists, col_fill_lists, line_solver, None, trace, index)
+            rating["steps"]["probe"] = trace.counters.get("probe_fixes", 0)
+            rating["probes"] = trace.counters.get("probes", 0)
+        else:
+            error = propagate(array, row_fill_lists, col_fill_lists, line_solver= \
+                overlap_masks if level == "overlap" else line_solver, trace=trace, index=index)
+            rating["steps"][level] = trace.counters.get("cells_fixed", 0)
+        if error:
+            rating["solutions"] = 0
+            break
+        if array.is_set() and is_solved(array, row_fill_lists, col_fill_lists):
+            break
+    steps = rating["steps"][rating["level"]]
+    rating["score"] = LEVELS.index(rating["level"]) + \
+        (steps / (steps + numrows * numcols) if steps else 0.0)
+    return rating
@@ -0,0 +1,208 @@
+"""
+SAT backend: the puzzle encoded as CNF and handed to pycosat, for puzzles too large or too
+ambiguous for the backtracking search. Loaded on first use of Grid.solve_sat; pycosat is
+optional and only needed here
+"""
+import time
+
+try:
+    import pycosat
+except ImportError: # optional dependency, see require_pycosat
+    pycosat = None
+
+from .line import ClueIndex, block_ranges, deduce_masks
+from .propagation import cap_guess
+
+FIRST_PROP_LIMIT = 100000 # propagations allowed per pycosat call at first when a deadline is set
+
+
+def require_pycosat():
+    if pycosat is None:
+        raise ImportError("The SAT backend requires pycosat (pip install pycosat)")
+
+
+def solve(pub_array, row_fill_lists, col_fill_lists, max_solutions=None, \
+    line_solver=deduce_masks, deadline=None, index=None):
+    """
+    search.solve on a SAT solver: returns a list of solution PackedArrays, stopping once
+    max_solutions have been found. Does not mutate input PackedArray pub_array
+
+    cap_guess runs first, so only the cells line logic leaves undecided become variables
+    and each line is encoded over the start range its blocks still have (see encode).
+    Further solutions are found by adding a clause that excludes each solution found
+
+    line_solver is as in cap_guess. deadline is an optional time.monotonic() value; pycosat
+    is then called with a propagation limit that doubles until it answers, and TimeoutError
+    is raised once the deadline passes between calls. index is an optional ClueIndex of the
+    fill_lists, shared by cap_guess and encode
+    """
+    require_pycosat()
+    if index is None:
+        index = ClueIndex(row_fill_lists, col_fill_lists)
+    array, error = cap_guess(pub_array, row_fill_lists, col_fill_lists, line_solver, \
+        index=index)
+    if error:
+        return []
+    if array.is_set():
+        return [array]
+    clauses, cell_variables = encode(array, row_fill_lists, col_fill_lists, index)
+    solutions = []
+    while clauses is not None and (max_solutions is None or len(solutions) < max_solutions):
+        model = run(clauses, deadline)
+        if model is None:
+            break
+        solution = array.deep_copy()
+        for (row, column), variable in cell_variables.items():
+            solution.set_type(1 if model[variable - 1] > 0 else 0, row, column)
+        solutions.append(solution)
+        clauses.append([-model[variable - 1] for variable in cell_variables.values()])
+    return solutions
+
+
+def count_solutions(pub_array, row_fill_lists, col_fill_lists, limit=2, \
+    line_solver=deduce_masks, deadline=None, index=None):
+    """Returns the number of solutions of the puzzle, counting no further than limit"""
+    return len(solve(pub_array, row_fill_lists, col_fill_lists, limit, line_solver, deadline, \
+        index))
+
+
+def is_unique(pub_array, row_fill_lists, col_fill_lists, line_solver=deduce_masks, \
+    deadline=None, index=None):
+    """Returns whether the puzzle has exactly one solution; stops at the second"""
+    return count_solutions(pub_array, row_fill_lists, col_fill_lists, 2, line_solver, \
+        deadline, index) == 1
+
+
+def run(clauses, deadline):
+    """Returns a model of clauses as a list of literals, variable i at index i-1, or None
+    if they are unsatisfiable"""
+    if deadline is None:
+        model = pycosat.solve(clauses)
+    else:
+        prop_limit = FIRST_PROP_LIMIT
+        while True:
+            if time.monotonic() > deadline:
+                raise TimeoutError("SAT solving did not finish before its deadline")
+            model = pycosat.solve(clauses, prop_limit=prop_limit)
+            if model != "UNKNOWN":
+                break
+            prop_limit *= 2
+    return None if model == "UNSAT" else model
+
+
+def encode(array, row_fill_lists, col_fill_lists, index=None):
+    """
+    Returns (clauses, cell_variables) for the partially solved PackedArray array, where
+    cell_variables maps the (row, column) of each undecided cell to its variable, true for
+    filled; clauses is None if some line cannot be completed
+
+    Each undecided line is order encoded: variable t(b, p) means "block b starts at or
+    before p", for p within the block's start range from block_ranges (before the range
+    it is false, from its end on true). The ranges are searched for within the bounds the
+    optional ClueIndex index has narrowed for the line. Clauses keep t monotone in p, keep each block at
+    least one cell after the previous one, fill every cell a block covers (block b covers
+    cell c when t(b, c) and not t(b, c - size)), and cover every filled cell by some block,
+    through an auxiliary variable where more than one block could cover it. Decided cells
+    enter as constants, so the model only holds what line logic left open
+    """
+    numrows, numcols = array.numrows, array.numcols
+    if index is None:
+        index = ClueIndex(row_fill_lists, col_fill_lists)
+    cell_variables = {}
+    for row in range(numrows):
+        unknown = ((1 << numcols) - 1) & ~(array.row_filled[row] | array.row_crossed[row])
+        for column in range(numcols):
+            if unknown >> column & 1:
+                cell_variables[(row, column)] = len(cell_variables) + 1
+    encoder = {"clauses": [], "next": len(cell_variables) + 1}
+    for is_row, count, length, fill_lists in ((True, numrows, numcols, row_fill_lists), \
+        (False, numcols, numrows, col_fill_lists)):
+        for line_index in range(count):
+            filled, crossed = array.get_row(line_index) if is_row else array.get_col(line_index)
+            if (filled | crossed) == (1 << length) - 1:
+                continue
+            def cell(position, line_index=line_index, filled=filled, crossed=crossed, \
+                is_row=is_row):
+                if filled >> position & 1:
+                    return True
+                if crossed >> position & 1:
+                    return False
+                return cell_variables[(line_index, position) if is_row else \
+                    (position, line_index)]
+            line = line_index if is_row else numrows + line_index
+            if not encode_line(encoder, cell, filled, crossed, length, fill_lists[line_index], \
+                index.get_starts(line, filled, crossed)):
+                return None, cell_variables
+    return encoder["clauses"], cell_variables
+
+
+def encode_line(encoder, cell, filled, crossed, length, fill_list, starts=None):
+    """Adds the clauses of one line to encoder (see encode); cell maps a position to its
+    variable or constant, and starts are optional bounds as in block_ranges. Returns False
+    if the line cannot be completed"""
+    ranges = block_ranges(filled, crossed, length, fill_list, starts)
+    if ranges is None:
+        return False
+    starts = [] # per block, dict from p to the variable t(b, p) inside the start range
+    for earliest, latest in ranges:
+        variables = {}
+        for position in range(earliest, latest):
+            variables[position] = encoder["next"]
+            encoder["next"] += 1
+        starts.append(variables)
+    def at_or_before(block, position):
+        earliest, latest = ranges[block]
+        if position < earliest:
+            return False
+        if position >= latest:
+            return True
+        return starts[block][position]
+    add = lambda literals: add_clause(encoder, literals)
+    for block, (earliest, latest) in enumerate(ranges):
+        size = fill_list[block]
+        for position in range(earliest + 1, latest):
+            add([negate(at_or_before(block, position - 1)), at_or_before(block, position)])
+        if block + 1 < len(ranges):
+            next_earliest, next_latest = ranges[block + 1]
+            for position in range(next_earliest, next_latest + 1):
+                add([negate(at_or_before(block + 1, position)), \
+                    at_or_before(block, position - size - 1)])
+        for position in range(earliest, latest + size):
+            add([negate(at_or_before(block, position)), at_or_before(block, position - size), \
+                cell(position)])
+    for position in range(length):
+        value = cell(position)
+        if value is False:
+            continue
+        coverers = [block for block, (earliest, latest) in enumerate(ranges) \
+            if earliest <= position < latest + fill_list[block]]
+        if len(coverers) == 1:
+            block = coverers[0]
+            add([negate(value), at_or_before(block, position)])
+            add([negate(value), negate(at_or_before(block, position - fill_list[block]))])
+            continue
+        covers = []
+        for block in coverers:
+            cover = encoder["next"]
+            encoder["next"] += 1
+            add([-cover, at_or_before(block, position)])
+            add([-cover, negate(at_or_before(block, position - fill_list[block]))])
+            covers.append(cover)
+        add([negate(value)] + covers)
+    return True
+
+
+def negate(literal):
+    return (not literal) if isinstance(literal, bool) else -literal
+
+
+def add_clause(encoder, literals):
+    """Appends the clause of literals to encoder, dropping false constants and skipping it
+    if a literal is a true constant. An empty clause is kept, making the CNF unsatisfiable"""
+    clause = []
+    for literal in literals:
+        if literal is True:
+            return
+        if literal is not False:
+            clause.append(literal)
+    encoder["clauses"].append(clause)
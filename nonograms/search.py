@@ -0,0 +1,154 @@
+"""
+Backtracking search over propagation, for puzzles line logic alone cannot finish
+"""
+import time
+from collections import deque
+
+from .line import ClueIndex, deduce_masks
+from .propagation import propagate
+
+def solve(pub_array, row_fill_lists, col_fill_lists, max_solutions=None, \
+    line_solver=deduce_masks, deadline=None, stop=None, trace=None, level="line", index=None):
+    """Attempt to enumerate all solutions, or determine if no solutions are possible.
+    Depth-first search that branches on a cell of the most constrained undecided line,
+    propagates with nonograms.propagation.propagate, and backtracks by rolling the single
+    working PackedArray back to a checkpoint, undoing only the lines changed since
+    Does not mutate input PackedArray pub_array
+    Returns a list of solution arrays, stopping once max_solutions have been found
+    line_solver is as in Grid.cap_guess; the default deduces each line within the start
+    bounds index has narrowed, while the deduce method of a LineCache shares deductions
+    between sibling branches
+    deadline is an optional time.monotonic() value; TimeoutError is raised once it passes
+    stop is an optional object with an is_set method, such as a multiprocessing Event;
+    once it is set the search returns the solutions found so far
+    trace is an optional Trace, which also counts branch points, backtracks, solutions and
+    search depth
+    level is the propagation level run at every node, see propagate; "probe" visits far
+    fewer nodes on puzzles that need guessing, at a higher cost per node
+    index is an optional ClueIndex of the fill_lists, such as Grid.clue_index; one is built
+    if not given, and shared by every propagation of the search"""
+    if index is None:
+        index = ClueIndex(row_fill_lists, col_fill_lists)
+    if trace is None:
+        return search(pub_array, row_fill_lists, col_fill_lists, max_solutions, \
+            line_solver, deadline, stop, None, level, index)
+    started = time.perf_counter()
+    try:
+        return search(pub_array, row_fill_lists, col_fill_lists, max_solutions, \
+            line_solver, deadline, stop, trace, level, index)
+    finally:
+        trace.add_time("solve", time.perf_counter() - started)
+
+
+def search(pub_array, row_fill_lists, col_fill_lists, max_solutions, line_solver, \
+    deadline, stop, trace, level, index):
+    """The search loop of solve"""
+    solutions = []
+    array = pub_array.deep_copy()
+    solved_states = {} # shared by every propagation, see propagate
+    probe_cache = {} # likewise
+    if propagate(array, row_fill_lists, col_fill_lists, line_solver=line_solver, \
+        solved_states=solved_states, trace=trace, level=level, probe_cache=probe_cache, \
+        index=index):
+        return solutions
+    decisions = [] # (checkpoint before guess, row, column) for guesses whose X branch is untried
+    while True:
+        if deadline is not None and time.monotonic() > deadline:
+            raise TimeoutError("Search did not finish before its deadline")
+        if stop is not None and stop.is_set():
+            return solutions
+        cell = choose_branch_cell(array, index)
+        if cell is None: # propagation settled every line, so this is a solution
+            solutions.append(array.deep_copy())
+            if trace is not None:
+                trace.count("solutions")
+            if max_solutions is not None and len(solutions) >= max_solutions:
+                return solutions
+            error = 1
+        else:
+            row, column = cell
+            decisions.append((array.checkpoint(), row, column))
+            if trace is not None:
+                trace.count("branch_points")
+                trace.record_max("search_depth", len(decisions))
+            array.set_type(1, row, column)
+            error = propagate(array, row_fill_lists, col_fill_lists, [row], [column], \
+                line_solver, solved_states, trace, level, probe_cache, index)
+        while error:
+            if not decisions:
+                return solutions
+            marker, row, column = decisions.pop()
+            if trace is not None:
+                trace.count("backtracks")
+            array.rollback(marker)
+            array.set_type(0, row, column)
+            error = propagate(array, row_fill_lists, col_fill_lists, [row], [column], \
+                line_solver, solved_states, trace, level, probe_cache, index)
+
+
+def split(pub_array, row_fill_lists, col_fill_lists, count, line_solver=deduce_masks):
+    """
+    Expands the search tree of solve breadth first until at least count open subproblems
+    are left or the tree is exhausted. Returns a 2-tuple of lists of PackedArrays: the open
+    subproblems, whose solution sets are disjoint, and the solutions met while expanding
+    Does not mutate input PackedArray pub_array
+    """
+    array = pub_array.deep_copy()
+    index = ClueIndex(row_fill_lists, col_fill_lists)
+    if propagate(array, row_fill_lists, col_fill_lists, line_solver=line_solver, index=index):
+        return [], []
+    frontier, solutions = deque([array]), []
+    while frontier and len(frontier) < count:
+        array = frontier.popleft()
+        cell = choose_branch_cell(array, index)
+        if cell is None:
+            solutions.append(array)
+            continue
+        row, column = cell
+        for type_index in (1, 0):
+            branch = array.deep_copy()
+            branch.set_type(type_index, row, column)
+            if not propagate(branch, row_fill_lists, col_fill_lists, [row], [column], \
+                line_solver, index=index):
+                frontier.append(branch)
+    return list(frontier), solutions
+
+
+def count_solutions(pub_array, row_fill_lists, col_fill_lists, limit=2, \
+    line_solver=deduce_masks, level="line", index=None):
+    """Returns the number of solutions of the puzzle, counting no further than limit"""
+    return len(solve(pub_array, row_fill_lists, col_fill_lists, limit, line_solver, \
+        level=level, index=index))
+
+
+def is_unique(pub_array, row_fill_lists, col_fill_lists, line_solver=deduce_masks, \
+    level="line", index=None):
+    """Returns whether the puzzle has exactly one solution; stops searching at the second"""
+    return count_solutions(pub_array, row_fill_lists, col_fill_lists, 2, \
+        line_solver, level, index) == 1
+
+
+def choose_branch_cell(array, index=None):
+    """
+    Returns the (row, column) of the first undecided cell in the undecided row or column
+    with the fewest undecided cells, or None if the PackedArray array is_set
+    With a ClueIndex index, ties go to the line with the least slack, whose cells the
+    clues constrain most
+    """
+    best, best_key = None, None
+    for lines_filled, lines_crossed, length, is_row, offset in \
+        ((array.row_filled, array.row_crossed, array.numcols, True, 0), \
+        (array.col_filled, array.col_crossed, array.numrows, False, array.numrows)):
+        full = (1 << length) - 1
+        for line_index in range(len(lines_filled)):
+            unknown = full & ~(lines_filled[line_index] | lines_crossed[line_index])
+            if not unknown:
+                continue
+            count = bin(unknown).count("1")
+            key = (count, index.slacks[line_index + offset] if index is not None else 0)
+            if best_key is None or key < best_key:
+                cell = (unknown & -unknown).bit_length() - 1
+                best, best_key = ((line_index, cell) if is_row else (cell, line_index)), key
+                if count == 1:
+                    return best
+    return best
@@ -0,0 +1,190 @@
+"""
+Incremental solving for interactive play. Loaded on first use of nonograms.Session
+"""
+from .core import PackedArray
+from .line import LineCache
+from .propagation import is_solved, propagate
+
+
+class Session:
+    """
+    A puzzle being played: the player's marks, plus everything line logic deduces from them,
+    kept up to date one edit at a time
+
+    Marking an undecided cell propagates from that cell's row and column only, against a
+    solved_states dict and the grid's clue_index kept for the whole session, so an edit
+    costs about as much as the deductions it triggers. Every edit opens a checkpoint on both
+    arrays, so undo rolls back just the lines the edit changed. A new mark on marks already
+    found contradictory costs nothing, since more information cannot resolve a contradiction
+
+    Changing or clearing a mark cannot be handled by propagation, which only adds
+    information. If the cell is the one the last edit marked, that edit is undone and the
+    cell marked afresh, so the two edits become one in history. Any older mark is changed by
+    rebuilding the deductions from all the marks, which costs a full propagation: on random
+    50x50 puzzles about 60-90 ms at the median and up to 300 ms, against a few microseconds
+    (well under a millisecond at the 95th percentile) for a new mark or a correction of the
+    last one
+
+    Attributes -
+    grid          - the Grid being played
+    marks         - PackedArray of the cells the player has decided
+    closure       - PackedArray of marks plus every cell line logic deduces from them;
+                    only meaningful while contradiction is False
+    contradiction - whether line logic finds the marks inconsistent with the clues
+    history       - list of (row, column, previous contradiction, closure marker,
+                    marks marker), one per edit not yet undone
+    line_solver   - line solver used for every deduction, by default a LineCache's deduce
+    """
+
+    def __init__(self, grid, line_solver=None):
+        self.grid = grid
+        self.line_solver = line_solver if line_solver is not None else LineCache().deduce
+        self.marks = grid.pub_array.deep_copy()
+        self.closure = self.marks.deep_copy()
+        self.solved_states = {}
+        self.history = []
+        self.contradiction = bool(propagate(self.closure, grid.row_fill_lists, \
+            grid.col_fill_lists, line_solver=self.line_solver, solved_states=self.solved_states, \
+            index=grid.clue_index))
+
+    def mark(self, row, column, type_index):
+        """
+        Sets a cell of the player's marks to type_index (1 filled, 0 X, 2 to clear it) and
+        updates the deductions. Returns whether the marks are still consistent with the clues
+        as far as line logic can tell. Changing the cell the last edit marked replaces that
+        edit, so a following undo reverts both
+        """
+        previous = self.marks.get_type(row, column)
+        if previous == type_index:
+            return not self.contradiction
+        if previous != 2 and self.history and self.history[-1][:2] == (row, column):
+            # changing the cell the last edit marked: undo that edit instead of rebuilding
+            self.undo()
+            return self.mark(row, column, type_index)
+        self.history.append((row, column, self.contradiction, self.closure.checkpoint(), \
+            self.marks.checkpoint()))
+        self.marks.set_type(type_index, row, column)
+        deduced = self.closure.get_type(row, column)
+        if previous != 2:
+            self.contradiction = bool(self.rebuild())
+        elif self.contradiction: # a new mark only adds information, so it stays contradictory
+            pass
+        elif deduced == 2:
+            self.closure.set_type(type_index, row, column)
+            self.contradiction = bool(propagate(self.closure, self.grid.row_fill_lists, \
+                self.grid.col_fill_lists, [row], [column], self.line_solver, self.solved_states, \
+                index=self.grid.clue_index))
+        elif deduced != type_index:
+            self.contradiction = True
+        return not self.contradiction
+
+    def undo(self):
+        """Reverts the last edit not yet undone and returns its (row, column), or None if
+        there is none"""
+        if not self.history:
+            return None
+        row, column, self.contradiction, closure_marker, marks_marker = self.history.pop()
+        self.closure.rollback(closure_marker)
+        self.marks.rollback(marks_marker)
+        return row, column
+
+    def is_consistent(self, row, column, type_index):
+        """
+        Returns whether marking the cell would keep the marks consistent with the clues, as
+        far as line logic can tell, without changing the session
+
+        Marking an undecided cell is tried on the closure from the cell's row and column and
+        rolled back, which costs about what mark does. Changing a mark, or clearing one while
+        the marks are contradictory, has to deduce from all the changed marks: a full
+        propagation like the rebuild of mark, on 50x50 puzzles 60-300 ms rather than well
+        under 1 ms
+        """
+        previous = self.marks.get_type(row, column)
+        if previous == type_index:
+            return not self.contradiction
+        if previous == 2 and self.contradiction:
+            return False # a new mark only adds information
+        if type_index == 2 and not self.contradiction:
+            return True # and clearing one only removes some
+        deduced = self.closure.get_type(row, column)
+        if previous == 2 and deduced != 2:
+            return deduced == type_index
+        marker = self.closure.checkpoint()
+        if previous == 2:
+            rows, cols = [row], [column]
+        else:
+            for row_index in range(self.marks.numrows):
+                self.closure.set_row(row_index, *self.marks.get_row(row_index))
+            rows = cols = None
+        self.closure.set_type(type_index, row, column)
+        error = propagate(self.closure, self.grid.row_fill_lists, self.grid.col_fill_lists, \
+            rows, cols, self.line_solver, self.solved_states, index=self.grid.clue_index)
+        self.closure.rollback(marker)
+        return not error
+
+    def deducible(self):
+        """Returns a list of (row, column, type) for every undecided cell that line logic
+        decides from the current marks; empty while the marks are contradictory"""
+        if self.contradiction:
+            return []
+        cells = []
+        for row_index in range(self.marks.numrows):
+            filled = self.closure.row_filled[row_index] & ~self.marks.row_filled[row_index]
+            crossed = self.closure.row_crossed[row_index] & ~self.marks.row_crossed[row_index]
+            cells.extend((row_index, column_index, 1) \
+                for column_index in PackedArray.bit_indices(filled))
+            cells.extend((row_index, column_index, 0) \
+                for column_index in PackedArray.bit_indices(crossed))
+        cells.sort()
+        return cells
+
+    def next_step(self):
+        """
+        Returns a hint: a dict with keys "line" ("row" or "column"), "index" and "cells", a
+        list of (row, column, type) that deducing that single line of the current marks
+        decides; or None if line logic can decide nothing more (the puzzle is solved, needs
+        guessing, or the marks are contradictory)
+
+        Only lines holding a deducible cell are tried, and at least one of them always
+        yields, since propagation from the marks starts with such a line
+        """
+        if self.contradiction:
+            return None
+        numrows, numcols = self.marks.numrows, self.marks.numcols
+        rows, cols = [], 0
+        for row_index in range(numrows):
+            new = (self.closure.row_filled[row_index] | self.closure.row_crossed[row_index]) & \
+                ~(self.marks.row_filled[row_index] | self.marks.row_crossed[row_index])
+            if new:
+                rows.append(row_index)
+                cols |= new
+        for line, index, length, fill_list in \
+            [("row", row_index, numcols, self.grid.row_fill_lists[row_index]) \
+                for row_index in rows] + \
+            [("column", column_index, numrows, self.grid.col_fill_lists[column_index]) \
+                for column_index in PackedArray.bit_indices(cols)]:
+            filled, crossed = self.marks.get_row(index) if line == "row" else \
+                self.marks.get_col(index)
+            new_filled, new_crossed, error = self.line_solver(filled, crossed, length, fill_list)
+            if error or (new_filled, new_crossed) == (filled, crossed):
+                continue
+            cells = [(cell, 1) for cell in PackedArray.bit_indices(new_filled & ~filled)] + \
+                [(cell, 0) for cell in PackedArray.bit_indices(new_crossed & ~crossed)]
+            cells.sort()
+            return {"line": line, "index": index,
+                    "cells": [(index, cell, type_index) if line == "row" else \
+                        (cell, index, type_index) for cell, type_index in cells]}
+        return None
+
+    def is_solved(self):
+        """Returns whether the marks are a complete solution"""
+        return is_solved(self.marks, self.grid.row_fill_lists, self.grid.col_fill_lists)
+
+    def rebuild(self):
+        """Recomputes closure from the marks, on the trail so that undo still works.
+        Returns 1 if a contradiction was found, else 0"""
+        for row_index in range(self.marks.numrows):
+            self.closure.set_row(row_index, *self.marks.get_row(row_index))
+        return propagate(self.closure, self.grid.row_fill_lists, self.grid.col_fill_lists, \
+            line_solver=self.line_solver, solved_states=self.solved_states, \
+            index=self.grid.clue_index)
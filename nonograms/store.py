@@ -0,0 +1,194 @@
+"""
+Duplicate detection for puzzle corpora: a canonical form of the clues that is the same for
+all 8 symmetries of a grid (transposes, flips and rotations), and SolutionStore, an SQLite
+file of solve results keyed by it. Loaded on first use of nonograms.SolutionStore
+"""
+import hashlib
+import json
+import sqlite3
+
+from .core import PackedArray
+from .line import reverse_mask
+
+# (transpose, flip_rows, flip_cols): the rows are reversed first if flip_rows, then each row
+# if flip_cols, then the grid is transposed if transpose. Identity first
+SYMMETRIES = tuple((transpose, flip_rows, flip_cols) for transpose in (False, True) \
+    for flip_rows in (False, True) for flip_cols in (False, True))
+
+
+def canonical_form(row_fill_lists, col_fill_lists):
+    """
+    Returns a 2-tuple (key, symmetry): key is a hex string, equal for two puzzles exactly
+    when one's clues are the other's under some symmetry, and symmetry (one of SYMMETRIES)
+    takes this puzzle to the canonical orientation the key stands for
+
+    The canonical orientation is the one whose clue_string is smallest; key is its SHA-256
+    """
+    best_text, best_symmetry = None, None
+    for symmetry in SYMMETRIES:
+        text = clue_string(*transform_clues(row_fill_lists, col_fill_lists, symmetry))
+        if best_text is None or text < best_text:
+            best_text, best_symmetry = text, symmetry
+    return hashlib.sha256(best_text.encode()).hexdigest(), best_symmetry
+
+
+def clue_string(row_fill_lists, col_fill_lists):
+    """Returns the clues as text: "rowsxcols:" then the row clues, "/" and the column clues,
+    clues separated by ";" and blocks by "."
+    """
+    return "%dx%d:%s/%s" % (len(row_fill_lists), len(col_fill_lists), \
+        ";".join(".".join(map(str, fill_list)) for fill_list in row_fill_lists), \
+        ";".join(".".join(map(str, fill_list)) for fill_list in col_fill_lists))
+
+
+def transform_clues(row_fill_lists, col_fill_lists, symmetry):
+    """Returns the (row_fill_lists, col_fill_lists) of the puzzle under symmetry, as tuples
+    of tuples. Reversing the rows reverses the order of the row clues and every column clue,
+    and likewise for the columns"""
+    transpose, flip_rows, flip_cols = symmetry
+    rows = tuple(tuple(fill_list) for fill_list in row_fill_lists)
+    cols = tuple(tuple(fill_list) for fill_list in col_fill_lists)
+    if flip_rows:
+        rows, cols = rows[::-1], tuple(fill_list[::-1] for fill_list in cols)
+    if flip_cols:
+        rows, cols = tuple(fill_list[::-1] for fill_list in rows), cols[::-1]
+    if transpose:
+        rows, cols = cols, rows
+    return rows, cols
+
+
+def transform_masks(row_masks, numrows, numcols, symmetry):
+    """Returns the row filled masks of an is_set grid under symmetry, as a tuple; the grid
+    has numrows x numcols cells before the transform"""
+    transpose, flip_rows, flip_cols = symmetry
+    masks = list(row_masks)
+    if flip_rows:
+        masks.reverse()
+    if flip_cols:
+        masks = [reverse_mask(mask, numcols) for mask in masks]
+    if transpose:
+        columns = [0] * numcols
+        for row_index, mask in enumerate(masks):
+            for column_index in PackedArray.bit_indices(mask):
+                columns[column_index] |= 1 << row_index
+        masks = columns
+    return tuple(masks)
+
+
+def inverse_symmetry(symmetry):
+    """Returns the symmetry undoing symmetry. Flips commute with each other, and after a
+    transpose the rows are what were the columns, so only a transpose swaps the flips"""
+    transpose, flip_rows, flip_cols = symmetry
+    return (transpose, flip_cols, flip_rows) if transpose else symmetry
+
+
+class SolutionStore:
+    """
+    Solve results kept on disk, so that a puzzle seen before, or any of its symmetric
+    variants, is answered with one primary-key lookup instead of a search
+
+    Each row of the solutions table holds a canonical_form key, the dimensions and the
+    solutions in the canonical orientation (JSON lists of row filled masks), and whether
+    those are all the puzzle's solutions (exhausted) or just the first ones a search stopped
+    at. Writes are committed every commit_every records and on close; the file is opened
+    in WAL mode so other processes can read it meanwhile
+
+    Attributes -
+    path         - path of the SQLite file, created if missing
+    connection   - the open sqlite3 connection
+    commit_every - records between commits
+    uncommitted  - records written since the last commit
+    hits         - lookups answered from the store
+    misses       - lookups that were not
+    """
+
+    def __init__(self, path, commit_every=64):
+        assert commit_every > 0, "commit_every must be positive"
+        self.path = path
+        self.commit_every = commit_every
+        self.uncommitted = 0
+        self.hits = 0
+        self.misses = 0
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS solutions (key TEXT PRIMARY KEY, "
+                                "numrows INTEGER, numcols INTEGER, exhausted INTEGER, "
+                                "solutions TEXT)")
+        self.connection.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def contains(self, row_fill_lists, col_fill_lists):
+        """Returns whether the puzzle, or a symmetric variant of it, has a record"""
+        key, _ = canonical_form(row_fill_lists, col_fill_lists)
+        return self.connection.execute("SELECT 1 FROM solutions WHERE key = ?", \
+            (key,)).fetchone() is not None
+
+    def lookup(self, row_fill_lists, col_fill_lists, max_solutions=2):
+        """
+        Returns a 2-tuple (solutions, complete), or None if the store cannot tell: the puzzle
+        has no record, or its record stopped short of max_solutions solutions. solutions is a
+        list of tuples of row filled masks (at most max_solutions, None for no limit), and
+        complete is whether they are all the puzzle's solutions rather than the first ones
+        """
+        key, symmetry = canonical_form(row_fill_lists, col_fill_lists)
+        row = self.connection.execute("SELECT numrows, numcols, exhausted, solutions FROM "
+                                      "solutions WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            numrows, numcols, exhausted, solutions = row
+            solutions = json.loads(solutions)
+            if exhausted or (max_solutions is not None and len(solutions) >= max_solutions):
+                self.hits += 1
+                inverse = inverse_symmetry(symmetry)
+                complete = bool(exhausted) and (max_solutions is None or \
+                    len(solutions) <= max_solutions)
+                return [transform_masks(masks, numrows, numcols, inverse) \
+                    for masks in solutions[:max_solutions]], complete
+        self.misses += 1
+        return None
+
+    def record(self, row_fill_lists, col_fill_lists, solutions, exhausted):
+        """
+        Stores the solutions found for the puzzle, each a tuple of row filled masks, and
+        whether they are all of them. A record already present is only replaced by one that
+        knows more (exhausted, or more solutions). Returns whether the puzzle was new
+        """
+        key, symmetry = canonical_form(row_fill_lists, col_fill_lists)
+        numrows, numcols = len(row_fill_lists), len(col_fill_lists)
+        canonical = [list(transform_masks(masks, numrows, numcols, symmetry)) \
+            for masks in solutions]
+        if symmetry[0]:
+            numrows, numcols = numcols, numrows
+        row = self.connection.execute("SELECT exhausted, solutions FROM solutions WHERE "
+                                      "key = ?", (key,)).fetchone()
+        if row is not None and (row[0] or (not exhausted and \
+            len(json.loads(row[1])) >= len(canonical))):
+            return False
+        self.connection.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?)", \
+            (key, numrows, numcols, int(bool(exhausted)), json.dumps(canonical)))
+        self.uncommitted += 1
+        if self.uncommitted >= self.commit_every:
+            self.commit()
+        return row is None
+
+    def commit(self):
+        self.connection.commit()
+        self.uncommitted = 0
+
+    def close(self):
+        """Commits pending records and closes the file"""
+        self.commit()
+        self.connection.close()
+
+    def get_stats(self):
+        """Returns a dict of the lookup counters and the number of records"""
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "records": len(self),
+                "hit_rate": self.hits / lookups if lookups else 0.0}
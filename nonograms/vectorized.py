@@ -0,0 +1,213 @@
+"""
+Batched line solving with NumPy: the placement-table deduction of deduce_masks run for many
+lines at once, and a propagation that deduces every pending row (then column) in one batch.
+Loaded on first use of Grid.propagate_batched or Grid.cap_guess_batched; NumPy is optional
+and only needed here
+"""
+import time
+
+try:
+    import numpy as np
+except ImportError: # optional dependency, see require_numpy
+    np = None
+
+from .core import PackedArray
+
+
+def require_numpy():
+    if np is None:
+        raise ImportError("Batched line solving requires NumPy (pip install numpy)")
+
+
+def deduce_batch(filled, crossed, length, fill_lists):
+    """
+    deduce_masks for many lines of the same length at once. Returns a 3-tuple of lists
+    (filled, crossed, errors), one entry per line; a line with an error keeps its input masks
+
+    Each line is padded with an X cell on both sides, which makes the first and last blocks
+    follow the same rules as the others, and the clues are padded to the longest fill_list.
+    The prefix tables are then built one block at a time for all lines together (see
+    prefix_tables), the suffix tables are the prefix tables of the reversed lines, and the
+    fill and X candidates come from a few whole-array operations, so the Python-level work
+    grows with the number of blocks, not with the number of lines or cells
+
+    Arguments:
+    filled, crossed - lists of int masks, as in deduce_masks
+    length          - number of cells in every line
+    fill_lists      - list of fill_lists, one per line
+    """
+    require_numpy()
+    num_lines = len(fill_lists)
+    if not num_lines:
+        return [], [], []
+    width = length + 2
+    rows = np.arange(num_lines)[:, None]
+    cells_filled = np.zeros((num_lines, width), bool)
+    cells_crossed = np.zeros((num_lines, width), bool)
+    cells_filled[:, 1:length + 1] = masks_to_array(filled, length)
+    cells_crossed[:, 1:length + 1] = masks_to_array(crossed, length)
+    cells_crossed[:, 0] = cells_crossed[:, -1] = True
+    num_blocks = np.array([len(fill_list) for fill_list in fill_lists])
+    max_blocks = int(num_blocks.max())
+    sizes = np.ones((num_lines, max_blocks), np.int64) # padding blocks are never read
+    reversed_sizes = np.ones((num_lines, max_blocks), np.int64)
+    for line, fill_list in enumerate(fill_lists):
+        sizes[line, :len(fill_list)] = fill_list
+        reversed_sizes[line, :len(fill_list)] = fill_list[::-1]
+    prefix, ends = prefix_tables(cells_filled, cells_crossed, sizes)
+    reversed_prefix, _ = prefix_tables(cells_filled[:, ::-1], cells_crossed[:, ::-1], \
+        reversed_sizes)
+    errors = ~prefix[rows[:, 0], num_blocks, width]
+    # suffix[l, j, i]: blocks j onwards of line l fit in cells i to the end
+    block_index = num_blocks[:, None] - np.arange(max_blocks + 1)[None, :]
+    valid = block_index >= 0
+    suffix = reversed_prefix[rows, np.maximum(block_index, 0)][:, :, ::-1] & valid[:, :, None]
+    # a cell can be an X if it lies in the gap after some prefix of the blocks
+    can_x = (prefix[:, :, :width] & suffix[:, :, 1:]).any(axis=1) & ~cells_filled
+    # a block can end at end if its prefix fits, the next cell is a gap, and the rest fits
+    placements = ends[:, :, :width] & ~cells_filled[:, None, :] & suffix[:, 1:, 1:]
+    placements &= (np.arange(max_blocks)[None, :] < num_blocks[:, None])[:, :, None]
+    # cell c is covered by a placement of block b ending in (c, c + size of b]
+    counts = np.zeros((num_lines, max_blocks, width + 1), np.int32)
+    np.cumsum(placements, axis=2, out=counts[:, :, 1:])
+    cells = np.arange(width)[None, None, :]
+    upper = np.minimum(cells + sizes[:, :, None] + 1, width)
+    can_fill = ((np.take_along_axis(counts, upper, axis=2) - counts[:, :, 1:]) > 0).any(axis=1)
+    unknown = ~(cells_filled | cells_crossed)
+    new_filled = cells_filled | (can_fill & ~can_x & unknown)
+    new_crossed = cells_crossed | (can_x & ~can_fill & unknown)
+    new_filled = array_to_masks(new_filled[:, 1:length + 1])
+    new_crossed = array_to_masks(new_crossed[:, 1:length + 1])
+    errors = errors.tolist()
+    for line, error in enumerate(errors):
+        if error:
+            new_filled[line], new_crossed[line] = filled[line], crossed[line]
+    return new_filled, new_crossed, [int(error) for error in errors]
+
+
+def prefix_tables(cells_filled, cells_crossed, sizes):
+    """
+    Returns (prefix, ends), the batched form of the prefix table of placement_tables
+    prefix[l, j, i] - the first j blocks of line l fit within its cells 0 to i-1
+    ends[l, j, i]   - block j (0-based) of line l can end just before cell i, with blocks
+                      0 to j-1 fitting before it
+    The lines are boolean arrays padded by an X cell on both sides and sizes holds each
+    line's block sizes. A block may end at i if it can end at some i' <= i with no filled
+    cell from i' to i-1, so each row of prefix is a cumulative count of ends, reset at
+    filled cells
+    """
+    num_lines, width = cells_filled.shape
+    max_blocks = sizes.shape[1]
+    positions = np.arange(width + 1)[None, :]
+    crossed_before = np.zeros((num_lines, width + 1), np.int32) # X cells in 0 to i-1
+    np.cumsum(cells_crossed, axis=1, out=crossed_before[:, 1:])
+    last_filled = np.full((num_lines, width + 1), -1) # last filled cell before i
+    last_filled[:, 1:] = np.maximum.accumulate(np.where(cells_filled, \
+        np.arange(width)[None, :], -1), axis=1)
+    reset = np.maximum(last_filled, 0)
+    has_filled = last_filled >= 0
+    prefix = np.zeros((num_lines, max_blocks + 1, width + 1), bool)
+    ends = np.zeros((num_lines, max_blocks, width + 1), bool)
+    prefix[:, 0, 0] = True
+    prefix[:, 0, 1:] = np.logical_and.accumulate(~cells_filled, axis=1)
+    # gap_allowed[l, j, g]: the first j blocks fit before cell g, which is not filled
+    gap_allowed = np.zeros((num_lines, max_blocks + 1, width), bool)
+    gap_allowed[:, 0] = prefix[:, 0, :width] & ~cells_filled
+    for block in range(max_blocks):
+        start = positions - sizes[:, block, None]
+        possible = start >= 1
+        gap = np.maximum(start, 1) - 1 # the cell before the block, which must not be filled
+        end_here = possible & (crossed_before == np.take_along_axis(crossed_before, gap + 1, \
+            1)) & np.take_along_axis(gap_allowed[:, block], gap, 1)
+        ends[:, block] = end_here
+        count = np.cumsum(end_here, axis=1)
+        prefix[:, block + 1] = count > np.take_along_axis(count, reset, 1) * has_filled
+        gap_allowed[:, block + 1, :width] = prefix[:, block + 1, :width] & ~cells_filled
+    return prefix, ends
+
+
+def masks_to_array(masks, length):
+    """Returns a len(masks) x length boolean array, bit i of masks[l] at [l, i]"""
+    num_bytes = (length + 7) // 8
+    data = b"".join(mask.to_bytes(num_bytes, "little") for mask in masks)
+    packed = np.frombuffer(data, np.uint8).reshape(len(masks), num_bytes)
+    return np.unpackbits(packed, axis=1, bitorder="little")[:, :length].astype(bool)
+
+
+def array_to_masks(cells):
+    """Inverse of masks_to_array: a list of int masks, one per row of the boolean array"""
+    packed = np.packbits(cells, axis=1, bitorder="little")
+    return [int.from_bytes(row.tobytes(), "little") for row in packed]
+
+
+def propagate_batched(array, row_fill_lists, col_fill_lists, rows=None, cols=None, \
+    trace=None):
+    """
+    propagate in batches: every pending row is deduced at once with deduce_batch, then
+    every column those deductions changed, and so on until nothing changes. Returns 1 if a
+    contradiction was found, else 0; array is modified in place as in propagate
+
+    Lines are revisited in whole sweeps rather than most-changed first, so a batch may
+    deduce a few lines propagate would have skipped, but each sweep costs a fixed number
+    of array operations however many lines it holds, which pays off on large grids
+
+    Arguments:
+    rows, cols - indices of the lines to deduce first (by default, all of them)
+    trace      - optional Trace; counts a round with its lines deduced, cells fixed and
+                 sweeps, and the time spent in deduce_batch
+    """
+    require_numpy()
+    started = time.perf_counter()
+    numrows, numcols = array.numrows, array.numcols
+    pending = [set(range(numrows) if rows is None else rows), \
+        set(range(numcols) if cols is None else cols)]
+    round_counts = {"lines": 0, "cells_fixed": 0, "sweeps": 0}
+    error = 0
+    while not error and (pending[0] or pending[1]):
+        for direction in (0, 1):
+            if not pending[direction]:
+                continue
+            indices = sorted(pending[direction])
+            pending[direction].clear()
+            if direction == 0:
+                get_line, set_line = array.get_row, array.set_row
+                length, fill_lists = numcols, row_fill_lists
+            else:
+                get_line, set_line = array.get_col, array.set_col
+                length, fill_lists = numrows, col_fill_lists
+            masks = [get_line(index) for index in indices]
+            solver_started = time.perf_counter()
+            new_filled, new_crossed, errors = deduce_batch([mask[0] for mask in masks], \
+                [mask[1] for mask in masks], length, [fill_lists[index] for index in indices])
+            if trace is not None:
+                trace.add_time("deduce", time.perf_counter() - solver_started)
+            round_counts["lines"] += len(indices)
+            round_counts["sweeps"] += 1
+            if any(errors):
+                error = 1
+                break
+            for position, index in enumerate(indices):
+                changed = set_line(index, new_filled[position], new_crossed[position])
+                if changed:
+                    round_counts["cells_fixed"] += bin(changed).count("1")
+                    pending[1 - direction].update(PackedArray.bit_indices(changed))
+    if trace is not None:
+        trace.add_time("propagate", time.perf_counter() - started)
+        trace.count("rounds")
+        trace.count("contradictions", error)
+        trace.count("lines_deduced", round_counts["lines"])
+        trace.count("cells_fixed", round_counts["cells_fixed"])
+        trace.count("sweeps", round_counts["sweeps"])
+        trace.add_round(error=error, **round_counts)
+    return error
+
+
+def cap_guess_batched(pub_array, row_fill_lists, col_fill_lists, trace=None):
+    """cap_guess using propagate_batched: returns (updated copy of pub_array, error)"""
+    if not isinstance(pub_array, PackedArray):
+        return_array, error = cap_guess_batched(PackedArray.from_filling_array(pub_array), \
+            row_fill_lists, col_fill_lists, trace)
+        return return_array.to_filling_array(), error
+    return_array = pub_array.deep_copy()
+    return return_array, propagate_batched(return_array, row_fill_lists, col_fill_lists, \
+        trace=trace)
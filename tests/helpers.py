@@ -0,0 +1,49 @@
+"""
+Random inputs and brute-force oracles shared by the tests
+"""
+import itertools
+
+from nonograms.core import PackedArray
+from nonograms.line import mask_fill_list
+
+
+def random_line(rng, length):
+    """Returns (filled, crossed, fill_list): the clue of a random line and a random partial
+    view of it, with an occasional wrong cell so that contradictions are covered too"""
+    key = rng.getrandbits(length)
+    fill_list = mask_fill_list(key, length)
+    filled = crossed = 0
+    for cell in range(length):
+        if rng.random() < 0.3:
+            value = key >> cell & 1
+            if rng.random() < 0.1:
+                value = 1 - value
+            if value:
+                filled |= 1 << cell
+            else:
+                crossed |= 1 << cell
+    return filled, crossed, fill_list
+
+
+def random_puzzle(rng, numrows, numcols):
+    """Returns (row_fill_lists, col_fill_lists) of a random key"""
+    key = PackedArray.generate_key(numrows, numcols, rng.random())
+    return [mask_fill_list(key.row_filled[row_index], numcols) \
+        for row_index in range(numrows)], \
+        [mask_fill_list(key.col_filled[column_index], numrows) \
+        for column_index in range(numcols)]
+
+
+def brute_force(row_fill_lists, col_fill_lists):
+    """Returns the set of solutions of the puzzle as tuples of row filled masks, trying
+    every combination of rows that satisfy their own clues"""
+    numrows, numcols = len(row_fill_lists), len(col_fill_lists)
+    choices = [[mask for mask in range(1 << numcols) \
+        if mask_fill_list(mask, numcols) == list(fill_list)] for fill_list in row_fill_lists]
+    solutions = set()
+    for masks in itertools.product(*choices):
+        if all(mask_fill_list(sum((masks[row_index] >> column_index & 1) << row_index \
+            for row_index in range(numrows)), numrows) == list(col_fill_lists[column_index]) \
+            for column_index in range(numcols)):
+            solutions.add(masks)
+    return solutions
@@ -0,0 +1,56 @@
+"""
+Checks of Batch: statuses, results across process counts, and seeded generation
+"""
+import random
+
+from helpers import brute_force, random_puzzle
+from nonograms.batch import Batch
+
+AMBIGUOUS = ([[1], [1]], [[1], [1]]) # two solutions, the diagonals
+UNIQUE = ([[1], []], [[1], []])
+IMPOSSIBLE = ([[2], []], [[1], []])
+
+
+def test_solve_status():
+    assert Batch.solve_status([], 2) == "unsolvable"
+    assert Batch.solve_status([(1,)], 2) == "unique"
+    assert Batch.solve_status([(1,)], None) == "unique"
+    assert Batch.solve_status([(1,)], 1) == "solved"
+    assert Batch.solve_status([(1,)], 1, complete=True) == "unique"
+    assert Batch.solve_status([(1,), (2,)], 2) == "multiple"
+
+
+def test_solve_statuses_and_max_solutions():
+    puzzles = [AMBIGUOUS, UNIQUE, IMPOSSIBLE]
+    statuses = lambda max_solutions: [result["status"] for _, result in \
+        Batch.solve(puzzles, jobs=1, max_solutions=max_solutions)]
+    assert statuses(2) == ["multiple", "unique", "unsolvable"]
+    assert statuses(1) == ["solved", "solved", "unsolvable"]
+    assert statuses(None) == ["multiple", "unique", "unsolvable"]
+    line = [result["status"] for _, result in Batch.solve(puzzles, jobs=1, method="line")]
+    assert line == ["stalled", "solved", "unsolvable"]
+
+
+def test_solve_matches_brute_force_over_processes():
+    rng = random.Random(12)
+    puzzles = [random_puzzle(rng, rng.randint(1, 4), rng.randint(1, 4)) for _ in range(30)]
+    serial = list(Batch.solve(puzzles, jobs=1, max_solutions=None))
+    assert [index for index, _ in serial] == list(range(30))
+    for (_, result), puzzle in zip(serial, puzzles):
+        assert set(result["solutions"]) == brute_force(*puzzle)
+    parallel = sorted(Batch.solve(puzzles, jobs=2, chunksize=4, ordered=False, \
+        max_solutions=None), key=lambda item: item[0])
+    assert [(index, result["solutions"]) for index, result in parallel] == \
+        [(index, result["solutions"]) for index, result in serial]
+
+
+def test_generate_is_seeded_per_spec():
+    specs = [{"numrows": 6, "numcols": 5, "seed": seed} for seed in range(6)]
+    serial = [result for _, result in Batch.generate(specs, jobs=1)]
+    parallel = [result for _, result in Batch.generate(specs, jobs=2, chunksize=2)]
+    assert [result["solution"] for result in serial] == \
+        [result["solution"] for result in parallel]
+    for result in serial:
+        assert result["status"] == "generated"
+        assert brute_force(result["row_fill_lists"], result["col_fill_lists"]) == \
+            {result["solution"]}
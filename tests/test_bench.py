@@ -0,0 +1,24 @@
+"""
+Checks of the benchmark harness options
+"""
+import json
+
+from nonograms import bench
+
+
+def run(tmp_path, *argv):
+    output = tmp_path / "results.json"
+    bench.main(["--stages", "cap_guess", "--sizes", "5", "--output", str(output)] + list(argv))
+    return json.loads(output.read_text())
+
+
+def test_quick_defaults(tmp_path):
+    report = run(tmp_path, "--quick")
+    assert report["meta"]["count"] == 5
+    assert [case["density"] for case in report["results"]] == [0.5]
+
+
+def test_count_and_densities_override_quick(tmp_path):
+    report = run(tmp_path, "--quick", "--count", "2", "--densities", "0.3,0.7")
+    assert report["meta"]["count"] == 2
+    assert [(case["density"], case["ops"]) for case in report["results"]] == [(0.3, 2), (0.7, 2)]
@@ -0,0 +1,68 @@
+"""
+Checks of the command-line interface's output and exit status
+"""
+import io
+import json
+
+import pytest
+
+from nonograms import cli
+
+AMBIGUOUS = '{"rows": [[1], [1]], "columns": [[1], [1]]}\n'
+UNIQUE = '{"rows": [[1], [0]], "columns": [[1], [0]], "goal": "1000"}\n'
+
+
+def run(monkeypatch, argv, text):
+    """Returns (exit status, JSON records written) of the command argv reading text on stdin"""
+    monkeypatch.setattr("sys.stdin", io.StringIO(text))
+    out = io.StringIO()
+    monkeypatch.setattr("sys.stdout", out)
+    status = cli.main(argv)
+    return status, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+@pytest.mark.parametrize("argv, text, expected, statuses", [
+    (["solve"], UNIQUE + AMBIGUOUS, 0, ["unique", "multiple"]),
+    (["solve", "--method", "line"], UNIQUE, 0, ["solved"]),
+    (["solve", "--method", "line"], AMBIGUOUS, 1, ["stalled"]),
+    (["solve"], '{"rows": [[2], []], "columns": [[1], []]}\n', 1, ["unsolvable"]),
+    (["verify-unique"], UNIQUE, 0, ["unique"]),
+    (["verify-unique"], UNIQUE + AMBIGUOUS, 1, ["unique", "multiple"]),
+    (["rate"], UNIQUE, 0, ["rated"]),
+])
+def test_exit_status(monkeypatch, argv, text, expected, statuses):
+    status, records = run(monkeypatch, argv, text)
+    assert status == expected
+    assert [record["status"] for record in records] == statuses
+    assert [record["index"] for record in records] == list(range(len(statuses)))
+
+
+def test_non_input_from_a_file(monkeypatch, tmp_path):
+    path = tmp_path / "puzzle.non"
+    path.write_text("rows\n1\n0\ncolumns\n1\n0\n")
+    status, records = run(monkeypatch, ["solve", str(path)], "")
+    assert status == 0 and records[0]["solutions"] == ["1000"]
+    assert records[0]["source"] == str(path)
+
+
+@pytest.mark.parametrize("argv, text", [
+    (["solve", "--format", "jsonl"], "not json\n"),
+    (["solve"], "rows\n1\ncolumns\n1 x\n"),
+    (["solve"], '{"rows": [[3]], "columns": [[1]]}\n'),
+    (["solve", "missing.non"], ""),
+    (["solve", "--method", "line", "--timeout", "1"], UNIQUE),
+    (["solve", "--method", "line", "--store", "store.db"], UNIQUE),
+])
+def test_bad_input_exits_with_status_2(monkeypatch, capsys, tmp_path, argv, text):
+    monkeypatch.chdir(tmp_path)
+    status, _ = run(monkeypatch, argv, text)
+    assert status == 2
+    assert "error" in capsys.readouterr().err
+
+
+def test_sat_without_pycosat_exits_with_status_2(monkeypatch, capsys):
+    import nonograms.sat
+    monkeypatch.setattr(nonograms.sat, "pycosat", None)
+    status, _ = run(monkeypatch, ["solve", "--method", "sat"], UNIQUE)
+    assert status == 2
+    assert "pycosat" in capsys.readouterr().err
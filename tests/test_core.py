@@ -0,0 +1,54 @@
+"""
+Checks of PackedArray's checkpoint and rollback trail
+"""
+import random
+
+from nonograms.core import PackedArray
+
+
+def test_rollback_restores_every_nested_checkpoint():
+    rng = random.Random(1)
+    array = PackedArray(6, 7)
+    markers, states = [], []
+    for _ in range(300):
+        if markers and rng.random() < 0.3:
+            depth = rng.randrange(len(markers))
+            array.rollback(markers[depth])
+            assert (array.row_filled, array.row_crossed) == states[depth]
+            # checkpoints opened at the same marker are alike, so only one of them closes
+            while depth + 1 < len(markers) and markers[depth + 1] == markers[depth]:
+                depth += 1
+            del markers[depth:], states[depth:]
+        elif rng.random() < 0.3:
+            states.append((array.row_filled[:], array.row_crossed[:]))
+            markers.append(array.checkpoint())
+        elif rng.random() < 0.5:
+            array.set_type(rng.randrange(3), rng.randrange(6), rng.randrange(7))
+        else:
+            array.set_col(rng.randrange(7), rng.getrandbits(6) & 0b101010, \
+                rng.getrandbits(6) & 0b010101)
+        assert array.checkpoints == markers
+        assert array == PackedArray.unpack(array.pack()) # rows and columns agree
+    while markers:
+        array.rollback(markers.pop())
+    assert array.trail is None
+
+
+def test_rollback_of_outer_checkpoint_closes_inner_ones():
+    array = PackedArray(2, 2)
+    outer = array.checkpoint()
+    array.set_type(1, 0, 0)
+    array.checkpoint()
+    array.set_type(0, 1, 1)
+    array.rollback(outer)
+    assert array.checkpoints == [] and array.trail is None
+    assert array == PackedArray(2, 2)
+
+
+def test_unchanged_cell_is_not_trailed():
+    array = PackedArray(2, 2, [[1, 2], [2, 0]])
+    marker = array.checkpoint()
+    array.set_type(1, 0, 0)
+    array.set_row(1, 0, 0b10)
+    assert array.trail == []
+    array.rollback(marker)
@@ -0,0 +1,119 @@
+"""
+Checks of PuzzleIO's .non and JSON Lines readers and writers
+"""
+import io
+import random
+
+import pytest
+
+from nonograms.core import PackedArray
+from nonograms.formats import PuzzleIO
+from nonograms.grid import Grid
+
+
+def random_grids(rng, count):
+    grids = []
+    for index in range(count):
+        numrows, numcols = rng.randint(1, 6), rng.randint(1, 6)
+        key = PackedArray.generate_key(numrows, numcols, rng.random())
+        grid = Grid(numrows, numcols, key)
+        if index % 2:
+            grid.key_array = None
+        grid.metadata = {"title": "Puzzle %d" % index, "by": "tests"}
+        grids.append(grid)
+    return grids
+
+
+def assert_same(grid, other):
+    assert other.row_fill_lists == grid.row_fill_lists
+    assert other.col_fill_lists == grid.col_fill_lists
+    assert other.key_array == grid.key_array
+    assert other.metadata == grid.metadata
+
+
+@pytest.mark.parametrize("writer, reader", [(PuzzleIO.write_non, PuzzleIO.read_non), \
+    (PuzzleIO.write_jsonl, PuzzleIO.read_jsonl)])
+def test_round_trip(writer, reader):
+    grids = random_grids(random.Random(1), 40)
+    stream = io.StringIO()
+    for grid in grids:
+        writer(stream, grid)
+    read = list(reader(io.StringIO(stream.getvalue())))
+    assert len(read) == len(grids)
+    for grid, other in zip(grids, read):
+        assert_same(grid, other)
+
+
+@pytest.mark.parametrize("name", ["puzzles.non", "puzzles.jsonl"])
+def test_write_and_read_by_extension(tmp_path, name):
+    grids = random_grids(random.Random(2), 5)
+    path = str(tmp_path / name)
+    assert PuzzleIO.write(path, grids) == 5
+    for grid, other in zip(grids, PuzzleIO.read(path)):
+        assert_same(grid, other)
+
+
+def test_read_non():
+    text = """# a comment
+title "Two"
+by someone
+width 3
+height 2
+
+rows
+1 1
+0
+
+columns
+1
+0
+1
+goal "101000"
+
+Title "Second"
+rows
+1
+columns
+1
+"""
+    first, second = PuzzleIO.read_non(io.StringIO(text))
+    assert first.row_fill_lists == [[1, 1], []]
+    assert first.col_fill_lists == [[1], [], [1]]
+    assert first.key_array == PackedArray(2, 3, [[1, 0, 1], [0, 0, 0]])
+    assert first.metadata == {"title": "Two", "by": "someone"}
+    assert second.metadata == {"title": "Second"} and second.key_array is None
+    assert second.row_fill_lists == second.col_fill_lists == [[1]]
+
+
+def test_read_jsonl_takes_a_lone_zero_as_an_empty_line():
+    grid, = PuzzleIO.read_jsonl(['{"rows": [[0], [1]], "columns": [[1]], "id": 7}\n', "\n"])
+    assert grid.row_fill_lists == [[], [1]] and grid.metadata == {"id": 7}
+
+
+@pytest.mark.parametrize("line", [
+    "not json",
+    '["rows", "columns"]',
+    '{"rows": [[1]]}',
+    '{"rows": [1], "columns": [[1]]}',
+    '{"rows": [[1]], "columns": [[true]]}',
+    '{"rows": [[-1]], "columns": [[1]]}',
+    '{"rows": [[2]], "columns": [[1]]}',
+    '{"rows": [[1]], "columns": [[1]], "goal": 1}',
+    '{"rows": [[1]], "columns": [[1]], "goal": "0"}',
+    '{"rows": [[1]], "columns": [[1]], "goal": "11"}',
+])
+def test_read_jsonl_rejects(line):
+    with pytest.raises(ValueError):
+        list(PuzzleIO.read_jsonl([line]))
+
+
+@pytest.mark.parametrize("text", [
+    "width x\nrows\n1\ncolumns\n1\n",
+    "width 2\nrows\n1\ncolumns\n1\n",
+    "rows\n1\nrows\n1\n",
+    "rows\n1 a\ncolumns\n1\n",
+    "rows\n1\ncolumns\n1\ngoal \"2\"\n",
+])
+def test_read_non_rejects(text):
+    with pytest.raises(ValueError):
+        list(PuzzleIO.read_non(io.StringIO(text)))
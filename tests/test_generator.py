@@ -0,0 +1,28 @@
+"""
+Checks that generated puzzles are uniquely solvable at the difficulty asked for
+"""
+import random
+
+from nonograms.core import PackedArray
+from nonograms.generator import generate
+from nonograms.propagation import cap_guess
+from nonograms.search import solve
+
+
+def test_line_puzzles_are_solved_by_line_logic():
+    random.seed(1)
+    for size in (1, 4, 8, 12):
+        for _ in range(5):
+            grid = generate(size, size + 1)
+            blank = PackedArray(grid.numrows, grid.numcols)
+            solved, error = cap_guess(blank, grid.row_fill_lists, grid.col_fill_lists)
+            assert not error and solved == grid.key_array
+
+
+def test_search_puzzles_are_unique_but_need_search():
+    random.seed(2)
+    for _ in range(5):
+        grid = generate(7, 7, difficulty="search")
+        blank = PackedArray(grid.numrows, grid.numcols)
+        assert not cap_guess(blank, grid.row_fill_lists, grid.col_fill_lists)[0].is_set()
+        assert solve(blank, grid.row_fill_lists, grid.col_fill_lists, 2) == [grid.key_array]
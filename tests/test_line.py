@@ -0,0 +1,95 @@
+"""
+Checks of the line solvers against enumeration, and of ClueIndex and LineCache
+"""
+import random
+
+from helpers import random_line, random_puzzle
+from nonograms.core import Row
+from nonograms.line import ClueIndex, LineCache, block_ranges, deduce_masks
+
+
+def test_row_deduce_matches_enumeration():
+    rng = random.Random(1)
+    for _ in range(2000):
+        length = rng.randint(1, 10)
+        filled, crossed, fill_list = random_line(rng, length)
+        pub_row = Row.from_masks(filled, crossed, length)
+        deduced, error = Row.deduce(pub_row, fill_list)
+        expected, expected_error = Row.enumerate_deduce(pub_row, fill_list)
+        assert error == expected_error, (filled, crossed, length, fill_list)
+        if not error:
+            assert [filling.get_type() for filling in deduced] == \
+                [filling.get_type() for filling in expected], (filled, crossed, length, fill_list)
+
+
+def test_clue_index_deduce_matches_deduce_masks():
+    """Deducing each line along a chain of ever more decided states, then again from a blank
+    line, exercises both the narrowed start bounds and their reset after a rollback"""
+    rng = random.Random(2)
+    for _ in range(100):
+        numrows, numcols = rng.randint(1, 12), rng.randint(1, 12)
+        row_fill_lists, col_fill_lists = random_puzzle(rng, numrows, numcols)
+        index = ClueIndex(row_fill_lists, col_fill_lists)
+        for line in range(numrows + numcols):
+            length, fill_list = index.lengths[line], list(index.fill_lists[line])
+            filled = crossed = 0
+            for _ in range(4):
+                assert index.deduce(line, filled, crossed) == \
+                    deduce_masks(filled, crossed, length, fill_list)
+                cell = 1 << rng.randrange(length)
+                if rng.random() < 0.5:
+                    filled |= cell & ~crossed
+                else:
+                    crossed |= cell & ~filled
+            assert index.deduce(line, 0, 0) == deduce_masks(0, 0, length, fill_list)
+
+
+def test_block_ranges_within_index_bounds():
+    rng = random.Random(7)
+    for _ in range(50):
+        numrows, numcols = rng.randint(1, 12), rng.randint(1, 12)
+        index = ClueIndex(*random_puzzle(rng, numrows, numcols))
+        for line in range(numrows + numcols):
+            length, fill_list = index.lengths[line], list(index.fill_lists[line])
+            filled, crossed, _ = random_line(rng, length)
+            filled, crossed, error = index.deduce(line, filled & ~crossed, crossed)
+            if not error:
+                assert block_ranges(filled, crossed, length, fill_list, \
+                    index.get_starts(line, filled, crossed)) == \
+                    block_ranges(filled, crossed, length, fill_list)
+
+
+def test_line_cache_answers_as_deduce_masks():
+    rng = random.Random(11)
+    cache = LineCache(max_entries=50)
+    lengths = [rng.randint(1, 12) for _ in range(40)]
+    lines = [(length,) + random_line(rng, length) for length in lengths]
+    for _ in range(3):
+        for length, filled, crossed, fill_list in lines:
+            assert cache.deduce(filled, crossed, length, fill_list) == \
+                deduce_masks(filled, crossed, length, fill_list)
+    assert cache.misses <= 40 and cache.hits + cache.misses == 120
+
+
+def test_line_cache_evicts_least_recently_used():
+    cache = LineCache(max_entries=3)
+    for size in (1, 2, 3):
+        cache.deduce(0, 0, 5, [size])
+    cache.deduce(0, 0, 5, [1]) # now the most recent
+    cache.deduce(0, 0, 5, [4])
+    assert len(cache) == 3 and cache.evictions == 1
+    cache.deduce(0, 0, 5, [1])
+    assert cache.hits == 2
+    cache.deduce(0, 0, 5, [2])
+    assert cache.misses == 5 # [2] was the one evicted
+
+
+def test_line_cache_respects_max_bytes():
+    cache = LineCache(max_entries=None, max_bytes=2000)
+    for size in range(1, 30):
+        cache.deduce(0, 0, 30, [size])
+        assert cache.size_bytes <= 2000
+    stats = cache.get_stats()
+    assert stats["evictions"] > 0 and stats["entries"] == len(cache) < 29
+    cache.clear()
+    assert len(cache) == 0 and cache.size_bytes == 0 and cache.get_stats()["misses"] == 29
@@ -0,0 +1,119 @@
+"""
+Checks of propagate, cap_guess and probe against brute force: whatever they decide must hold
+in every solution, and what they leave must be a fixpoint of line logic
+"""
+import random
+
+from helpers import brute_force, random_puzzle
+from nonograms.core import PackedArray
+from nonograms.instrument import Trace
+from nonograms.line import LineCache, deduce_masks
+from nonograms.propagation import cap_guess, probe, propagate
+
+
+def random_view(rng, numrows, numcols, row_fill_lists, col_fill_lists):
+    """Returns a PackedArray of a few cells of one of the puzzle's solutions, or of another
+    random key so that contradictions are covered too"""
+    masks = rng.choice(sorted(brute_force(row_fill_lists, col_fill_lists)))
+    if rng.random() < 0.3:
+        masks = tuple(rng.getrandbits(numcols) for _ in range(numrows))
+    array = PackedArray(numrows, numcols)
+    for row in range(numrows):
+        for column in range(numcols):
+            if rng.random() < 0.2:
+                array.set_type(masks[row] >> column & 1, row, column)
+    return array
+
+
+def consistent_solutions(array, row_fill_lists, col_fill_lists):
+    return [masks for masks in brute_force(row_fill_lists, col_fill_lists) \
+        if all(masks[row] & array.row_crossed[row] == 0 and \
+            masks[row] & array.row_filled[row] == array.row_filled[row] \
+            for row in range(array.numrows))]
+
+
+def assert_sound(array, solutions):
+    """Asserts every decided cell of array agrees with each of solutions"""
+    for masks in solutions:
+        for row in range(array.numrows):
+            assert masks[row] & array.row_filled[row] == array.row_filled[row]
+            assert masks[row] & array.row_crossed[row] == 0
+
+
+def assert_fixpoint(array, row_fill_lists, col_fill_lists):
+    """Asserts deduce_masks changes no line of array"""
+    for row, fill_list in enumerate(row_fill_lists):
+        filled, crossed = array.get_row(row)
+        assert deduce_masks(filled, crossed, array.numcols, fill_list) == (filled, crossed, 0)
+    for column, fill_list in enumerate(col_fill_lists):
+        filled, crossed = array.get_col(column)
+        assert deduce_masks(filled, crossed, array.numrows, fill_list) == (filled, crossed, 0)
+
+
+def decided(array):
+    return [filled | crossed for filled, crossed in zip(array.row_filled, array.row_crossed)]
+
+
+def random_cases(seed, count):
+    rng = random.Random(seed)
+    for _ in range(count):
+        numrows, numcols = rng.randint(1, 5), rng.randint(1, 5)
+        row_fill_lists, col_fill_lists = random_puzzle(rng, numrows, numcols)
+        array = random_view(rng, numrows, numcols, row_fill_lists, col_fill_lists)
+        yield array, row_fill_lists, col_fill_lists, \
+            consistent_solutions(array, row_fill_lists, col_fill_lists)
+
+
+def test_propagate_is_sound_and_reaches_a_fixpoint():
+    for array, row_fill_lists, col_fill_lists, solutions in random_cases(1, 300):
+        error = propagate(array, row_fill_lists, col_fill_lists)
+        if solutions:
+            assert not error
+        if not error:
+            assert_sound(array, solutions)
+            assert_fixpoint(array, row_fill_lists, col_fill_lists)
+
+
+def test_cap_guess_matches_propagate():
+    cache = LineCache()
+    for array, row_fill_lists, col_fill_lists, _ in random_cases(2, 200):
+        before = array.deep_copy()
+        for line_solver, trace in ((deduce_masks, None), (cache.deduce, Trace())):
+            result, error = cap_guess(array, row_fill_lists, col_fill_lists, line_solver, trace)
+            assert array == before # cap_guess works on a copy
+            expected = array.deep_copy()
+            assert error == propagate(expected, row_fill_lists, col_fill_lists)
+            if not error:
+                assert result == expected
+        filling_result, filling_error = cap_guess(array.to_filling_array(), row_fill_lists, \
+            col_fill_lists)
+        assert filling_error == error
+        if not error:
+            assert PackedArray.from_filling_array(filling_result) == result
+
+
+def test_probe_is_sound_and_decides_at_least_as_much_as_propagate():
+    for array, row_fill_lists, col_fill_lists, solutions in random_cases(3, 300):
+        if propagate(array, row_fill_lists, col_fill_lists):
+            assert not solutions
+            continue
+        line_decided = decided(array)
+        error = probe(array, row_fill_lists, col_fill_lists)
+        if solutions:
+            assert not error
+        if not error:
+            assert_sound(array, solutions)
+            assert_fixpoint(array, row_fill_lists, col_fill_lists)
+            assert all(cells & line_cells == line_cells \
+                for cells, line_cells in zip(decided(array), line_decided))
+            assert array.trail is None # every assumption was rolled back
+
+
+def test_cap_guess_at_probe_level_is_sound():
+    for array, row_fill_lists, col_fill_lists, solutions in random_cases(4, 200):
+        result, error = cap_guess(array, row_fill_lists, col_fill_lists, level="probe")
+        assert bool(error) <= (not solutions)
+        if not error:
+            assert_sound(result, solutions)
+            if result.is_set():
+                assert len(solutions) == 1
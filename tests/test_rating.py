@@ -0,0 +1,54 @@
+"""
+Checks that rate names the weakest technique that settles a puzzle
+"""
+import random
+
+from helpers import brute_force, random_puzzle
+from nonograms.cli import DEMO_KEY
+from nonograms.core import PackedArray
+from nonograms.grid import Grid
+from nonograms.line import overlap_masks
+from nonograms.propagation import cap_guess, is_solved
+from nonograms.rating import LEVELS, rate
+
+
+def settles(row_fill_lists, col_fill_lists, level):
+    """Returns whether technique level alone solves the puzzle or finds it contradictory"""
+    blank = PackedArray(len(row_fill_lists), len(col_fill_lists))
+    if level == "overlap":
+        array, error = cap_guess(blank, row_fill_lists, col_fill_lists, overlap_masks)
+    else:
+        array, error = cap_guess(blank, row_fill_lists, col_fill_lists, level=level)
+    return bool(error) or is_solved(array, row_fill_lists, col_fill_lists)
+
+
+def test_rate_names_the_weakest_level_that_settles_the_puzzle():
+    rng = random.Random(1)
+    for _ in range(150):
+        numrows, numcols = rng.randint(1, 6), rng.randint(1, 6)
+        row_fill_lists, col_fill_lists = random_puzzle(rng, numrows, numcols)
+        rating = rate(row_fill_lists, col_fill_lists)
+        level = LEVELS.index(rating["level"])
+        assert rating["solutions"] == min(2, len(brute_force(row_fill_lists, col_fill_lists)))
+        assert level <= rating["score"] < level + 1
+        for weaker in LEVELS[:min(level, 3)]:
+            assert not settles(row_fill_lists, col_fill_lists, weaker)
+        if rating["level"] != "search":
+            assert settles(row_fill_lists, col_fill_lists, rating["level"])
+            assert rating["solutions"] == 1
+
+
+def test_rate_of_known_puzzles():
+    assert rate([[2], [2]], [[2], [2]])["level"] == "overlap"
+    demo = Grid(13, 13, PackedArray(13, 13, DEMO_KEY))
+    rating = rate(demo.row_fill_lists, demo.col_fill_lists)
+    assert rating["level"] == "search" and rating["solutions"] == 2
+    assert rating["steps"]["search"] >= 1
+
+
+def test_search_difficulty_puzzles_are_rated_above_line():
+    for seed in range(3):
+        random.seed(seed)
+        grid = Grid.generate(10, 10, difficulty="search")
+        rating = rate(grid.row_fill_lists, grid.col_fill_lists)
+        assert rating["level"] in ("probe", "search") and rating["solutions"] == 1
@@ -0,0 +1,62 @@
+"""
+Checks of the SAT backend against brute force and the backtracking search; skipped without
+pycosat
+"""
+import random
+
+import pytest
+
+from helpers import brute_force, random_puzzle
+from nonograms.core import PackedArray
+from nonograms.line import ClueIndex
+from nonograms.search import count_solutions as search_count_solutions
+
+pytest.importorskip("pycosat")
+from nonograms import sat
+
+
+def test_count_solutions_matches_brute_force():
+    rng = random.Random(5)
+    for _ in range(60):
+        numrows, numcols = rng.randint(1, 4), rng.randint(1, 4)
+        row_fill_lists, col_fill_lists = random_puzzle(rng, numrows, numcols)
+        expected = len(brute_force(row_fill_lists, col_fill_lists))
+        assert sat.count_solutions(PackedArray(numrows, numcols), row_fill_lists, \
+            col_fill_lists, None) == expected
+        assert sat.count_solutions(PackedArray(numrows, numcols), row_fill_lists, \
+            col_fill_lists, 2) == min(2, expected)
+        assert sat.is_unique(PackedArray(numrows, numcols), row_fill_lists, \
+            col_fill_lists) == (expected == 1)
+
+
+def test_solve_from_a_partial_grid_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(60):
+        numrows, numcols = rng.randint(1, 5), rng.randint(1, 5)
+        row_fill_lists, col_fill_lists = random_puzzle(rng, numrows, numcols)
+        solutions = sorted(brute_force(row_fill_lists, col_fill_lists))
+        masks = rng.choice(solutions)
+        array = PackedArray(numrows, numcols)
+        for row in range(numrows):
+            for column in range(numcols):
+                if rng.random() < 0.2:
+                    array.set_type(masks[row] >> column & 1, row, column)
+        before = array.deep_copy()
+        expected = {solution for solution in solutions if all(solution[row] & \
+            array.row_crossed[row] == 0 and solution[row] & array.row_filled[row] == \
+            array.row_filled[row] for row in range(numrows))}
+        found = sat.solve(array, row_fill_lists, col_fill_lists, None, \
+            index=ClueIndex(row_fill_lists, col_fill_lists))
+        assert array == before
+        assert len(found) == len(expected)
+        assert {tuple(solution.row_filled) for solution in found} == expected
+
+
+def test_count_solutions_matches_search():
+    rng = random.Random(8)
+    for _ in range(20):
+        size = rng.randint(6, 9)
+        row_fill_lists, col_fill_lists = random_puzzle(rng, size, size)
+        assert sat.count_solutions(PackedArray(size, size), row_fill_lists, col_fill_lists, \
+            20) == search_count_solutions(PackedArray(size, size), row_fill_lists, \
+            col_fill_lists, 20)
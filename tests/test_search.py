@@ -0,0 +1,57 @@
+"""
+Checks of the backtracking search against brute force over every grid of small puzzles
+"""
+import random
+
+from helpers import brute_force, random_puzzle
+from nonograms.core import PackedArray
+from nonograms.search import count_solutions, is_unique, solve, split
+
+
+def found(solutions):
+    masks = [tuple(solution.row_filled) for solution in solutions]
+    assert len(masks) == len(set(masks)), "a solution was found twice"
+    return set(masks)
+
+
+def test_solve_matches_brute_force():
+    rng = random.Random(4)
+    for _ in range(60):
+        numrows, numcols = rng.randint(1, 4), rng.randint(1, 4)
+        row_fill_lists, col_fill_lists = random_puzzle(rng, numrows, numcols)
+        expected = brute_force(row_fill_lists, col_fill_lists)
+        blank = PackedArray(numrows, numcols)
+        for level in ("line", "probe"):
+            assert found(solve(blank, row_fill_lists, col_fill_lists, level=level)) == expected
+        assert len(solve(blank, row_fill_lists, col_fill_lists, 1)) == min(1, len(expected))
+        assert count_solutions(blank, row_fill_lists, col_fill_lists) == min(2, len(expected))
+        assert is_unique(blank, row_fill_lists, col_fill_lists) == (len(expected) == 1)
+
+
+def test_solve_from_partial_grid():
+    rng = random.Random(9)
+    for _ in range(60):
+        numrows, numcols = rng.randint(1, 4), rng.randint(1, 4)
+        row_fill_lists, col_fill_lists = random_puzzle(rng, numrows, numcols)
+        array = PackedArray(numrows, numcols)
+        for _ in range(rng.randint(0, 3)):
+            array.set_type(rng.randrange(2), rng.randrange(numrows), rng.randrange(numcols))
+        expected = {masks for masks in brute_force(row_fill_lists, col_fill_lists) \
+            if all(masks[row_index] & array.row_crossed[row_index] == 0 and \
+                masks[row_index] & array.row_filled[row_index] == array.row_filled[row_index] \
+                for row_index in range(numrows))}
+        before = array.pack()
+        assert found(solve(array, row_fill_lists, col_fill_lists)) == expected
+        assert array.pack() == before
+
+
+def test_split_partitions_the_solutions():
+    rng = random.Random(10)
+    for _ in range(40):
+        numrows, numcols = rng.randint(2, 5), rng.randint(2, 5)
+        row_fill_lists, col_fill_lists = random_puzzle(rng, numrows, numcols)
+        subproblems, solutions = split(PackedArray(numrows, numcols), row_fill_lists, \
+            col_fill_lists, 4)
+        for subproblem in subproblems:
+            solutions.extend(solve(subproblem, row_fill_lists, col_fill_lists))
+        assert found(solutions) == brute_force(row_fill_lists, col_fill_lists)
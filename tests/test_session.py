@@ -0,0 +1,69 @@
+"""
+Checks of Session against sessions built afresh from the same marks
+"""
+import random
+
+from nonograms.core import PackedArray
+from nonograms.grid import Grid
+from nonograms.session import Session
+
+
+def fresh(grid, marks):
+    """Returns a new Session of grid's clues starting from the marks"""
+    start = Grid(grid.numrows, grid.numcols, grid.key_array)
+    start.pub_array = marks.deep_copy()
+    return Session(start)
+
+
+def state(session):
+    return (session.marks.pack(), session.closure.pack(), list(session.history), \
+        session.contradiction)
+
+
+def test_edits_match_a_fresh_session():
+    rng = random.Random(1)
+    for _ in range(150):
+        size = rng.randint(2, 7)
+        key = PackedArray.generate_key(size, size, 0.5)
+        grid = Grid(size, size, key)
+        session = Session(grid)
+        for _ in range(40):
+            row, column = rng.randrange(size), rng.randrange(size)
+            type_index = rng.choice([0, 1, 2, key.get_type(row, column)])
+            action = rng.random()
+            if action < 0.15:
+                session.undo()
+            elif action < 0.5:
+                before = state(session)
+                consistent = session.is_consistent(row, column, type_index)
+                assert state(session) == before
+                marks = session.marks.deep_copy()
+                marks.set_type(type_index, row, column)
+                assert consistent == (not fresh(grid, marks).contradiction)
+                continue
+            else:
+                session.mark(row, column, type_index)
+            expected = fresh(grid, session.marks)
+            assert session.contradiction == expected.contradiction
+            if not expected.contradiction:
+                assert session.closure == expected.closure
+
+
+def test_is_consistent_keeps_the_last_mark():
+    grid = Grid(2, 2, PackedArray(2, 2, [[1, 0], [0, 1]]))
+    session = Session(grid)
+    session.mark(0, 1, 1)
+    before = state(session)
+    assert session.is_consistent(0, 1, 0)
+    assert state(session) == before and session.marks.get_type(0, 1) == 1
+
+
+def test_correcting_the_last_mark_merges_the_edits():
+    grid = Grid(2, 2, PackedArray(2, 2, [[1, 0], [0, 1]]))
+    session = Session(grid)
+    session.mark(1, 1, 1)
+    assert not session.mark(0, 1, 1)
+    assert session.mark(0, 1, 0)
+    assert len(session.history) == 2 and session.marks.get_type(0, 1) == 0
+    assert session.undo() == (0, 1) and session.marks.get_type(0, 1) == 2
+    assert not session.contradiction
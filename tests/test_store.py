@@ -0,0 +1,83 @@
+"""
+Checks of SolutionStore and the symmetries it keys puzzles by
+"""
+import random
+
+from helpers import brute_force, random_puzzle
+from nonograms.store import SYMMETRIES, SolutionStore, canonical_form, clue_string, \
+    inverse_symmetry, transform_clues, transform_masks
+
+AMBIGUOUS = ([[1], [1]], [[1], [1]])
+
+
+def test_canonical_form_is_the_same_under_every_symmetry():
+    rng = random.Random(1)
+    for _ in range(100):
+        numrows, numcols = rng.randint(1, 5), rng.randint(1, 5)
+        puzzle = random_puzzle(rng, numrows, numcols)
+        key, symmetry = canonical_form(*puzzle)
+        canonical = clue_string(*transform_clues(*puzzle, symmetry))
+        variants = {clue_string(*transform_clues(*puzzle, other)) for other in SYMMETRIES}
+        assert canonical == min(variants)
+        for other in SYMMETRIES:
+            variant = transform_clues(*puzzle, other)
+            variant_key, variant_symmetry = canonical_form(*variant)
+            assert variant_key == key
+            assert clue_string(*transform_clues(*variant, variant_symmetry)) == canonical
+        other = random_puzzle(rng, numrows, numcols)
+        assert (canonical_form(*other)[0] == key) == \
+            (clue_string(*other) in variants)
+
+
+def test_transform_masks_inverts():
+    rng = random.Random(2)
+    for _ in range(100):
+        numrows, numcols = rng.randint(1, 5), rng.randint(1, 5)
+        puzzle = random_puzzle(rng, numrows, numcols)
+        for masks in brute_force(*puzzle):
+            for symmetry in SYMMETRIES:
+                moved = transform_masks(masks, numrows, numcols, symmetry)
+                rows, cols = transform_clues(*puzzle, symmetry)
+                assert moved in brute_force(rows, cols)
+                assert transform_masks(moved, len(rows), len(cols), \
+                    inverse_symmetry(symmetry)) == masks
+
+
+def test_lookup_under_every_symmetry(tmp_path):
+    rng = random.Random(6)
+    with SolutionStore(str(tmp_path / "store.db")) as store:
+        for _ in range(30):
+            numrows, numcols = rng.randint(1, 4), rng.randint(1, 4)
+            row_fill_lists, col_fill_lists = random_puzzle(rng, numrows, numcols)
+            solutions = sorted(brute_force(row_fill_lists, col_fill_lists))
+            store.record(row_fill_lists, col_fill_lists, solutions, True)
+            for symmetry in SYMMETRIES:
+                rows, cols = transform_clues(row_fill_lists, col_fill_lists, symmetry)
+                found, complete = store.lookup(rows, cols, None)
+                assert complete
+                assert sorted(found) == sorted(transform_masks(masks, numrows, numcols, \
+                    symmetry) for masks in solutions)
+                assert set(found) == brute_force(rows, cols)
+
+
+def test_lookup_answers_only_what_the_record_knows(tmp_path):
+    solutions = sorted(brute_force(*AMBIGUOUS))
+    path = str(tmp_path / "store.db")
+    with SolutionStore(path) as store:
+        assert store.lookup(*AMBIGUOUS, 1) is None
+        assert store.record(*AMBIGUOUS, solutions[:1], False)
+        assert store.lookup(*AMBIGUOUS, 1) == (solutions[:1], False)
+        assert store.lookup(*AMBIGUOUS, 2) is None
+        assert store.lookup(*AMBIGUOUS, None) is None
+        assert not store.record(*AMBIGUOUS, [], False) # knows less, kept as it was
+        assert store.lookup(*AMBIGUOUS, 1) == (solutions[:1], False)
+        assert not store.record(*AMBIGUOUS, solutions, True)
+        assert store.lookup(*AMBIGUOUS, 1) == (solutions[:1], False)
+        assert store.lookup(*AMBIGUOUS, 2) == (solutions, True)
+        assert not store.record(*AMBIGUOUS, solutions[:1], False) # exhausted records stay
+    with SolutionStore(path) as store:
+        assert len(store) == 1 and store.contains(*AMBIGUOUS)
+        assert store.lookup(*AMBIGUOUS, None) == (solutions, True)
+        assert store.lookup([[2]], [[1], [1]], 2) is None
+        stats = store.get_stats()
+        assert (stats["hits"], stats["misses"], stats["records"]) == (1, 1, 1)
@@ -0,0 +1,38 @@
+"""
+Checks of the NumPy batch line solver against deduce_masks; skipped without NumPy
+"""
+import random
+
+import pytest
+
+from helpers import random_line, random_puzzle
+from nonograms.core import PackedArray
+from nonograms.line import deduce_masks
+from nonograms.propagation import cap_guess
+
+pytest.importorskip("numpy")
+from nonograms.vectorized import cap_guess_batched, deduce_batch
+
+
+def test_deduce_batch_matches_deduce_masks():
+    rng = random.Random(3)
+    for _ in range(50):
+        length = rng.randint(1, 20)
+        lines = [random_line(rng, length) for _ in range(rng.randint(1, 30))]
+        filled, crossed, errors = deduce_batch([line[0] for line in lines], \
+            [line[1] for line in lines], length, [line[2] for line in lines])
+        for line_index, (line_filled, line_crossed, fill_list) in enumerate(lines):
+            expected = deduce_masks(line_filled, line_crossed, length, fill_list)
+            assert bool(errors[line_index]) == bool(expected[2])
+            if not expected[2]:
+                assert (filled[line_index], crossed[line_index]) == expected[:2]
+
+
+def test_cap_guess_batched_matches_cap_guess():
+    rng = random.Random(8)
+    for _ in range(40):
+        numrows, numcols = rng.randint(1, 15), rng.randint(1, 15)
+        row_fill_lists, col_fill_lists = random_puzzle(rng, numrows, numcols)
+        blank = PackedArray(numrows, numcols)
+        assert cap_guess_batched(blank, row_fill_lists, col_fill_lists) == \
+            cap_guess(blank, row_fill_lists, col_fill_lists)